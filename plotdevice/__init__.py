@@ -32,7 +32,7 @@ class Halted(Exception): pass      # special exception to cleanly exit animation
 
 # note whether the module is being used within the .app, via console.py, or from the repl
 called_from = getattr(sys.modules['__main__'], '__file__', '<interactive>')
-is_windowed = bool(re.search(r'plotdevice(-app|/run/console)\.py$', called_from))
+is_windowed = bool(re.search(r'plotdevice(-app|/run/(console|worker|sweep))\.py$', called_from))
 in_setup = bool(called_from.endswith('setup.py')) # (for builds)
 
 # don't mess with sys.path during builds
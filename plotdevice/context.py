@@ -10,6 +10,7 @@ from .lib import pathmatics
 from .util import _copy_attr, _copy_attrs, _flatten, trim_zeroes, numlike, autorelease
 from .gfx.geometry import Dimension, parse_coords
 from .gfx.typography import Layout
+from .gfx.image import ImageCache, Lookahead
 from .gfx import *
 from . import gfx, lib, util, Halted, DeviceError
 
@@ -25,6 +26,7 @@ GridUnits = namedtuple('GridUnits', ['unit', 'dpx', 'to_px', 'from_px'])
 ### NSGraphicsContext wrapper (whose methods are the business-end of the user-facing API) ###
 class Context(object):
     _state_vars = '_outputmode', '_colormode', '_colorrange', '_fillcolor', '_strokecolor', '_penstyle', '_font', '_effects', '_path', '_autoclosepath', '_grid', '_transform', '_transformmode', '_thetamode', '_transformstack', '_oldvars', '_vars'
+    _mutable_vars = '_fillcolor', '_strokecolor', '_effects', '_transform', '_transformstack', '_vars' # modified in place (see _own)
 
     def __init__(self, canvas=None, ns=None):
         """Initializes the context.
@@ -34,9 +36,13 @@ class Context(object):
         """
         self.canvas = Canvas() if canvas is None else canvas
         self._ns = {} if ns is None else ns
-        self._imagecache = {}
+        self._imagecache = ImageCache()
+        self._readcache = util.readers.ReadCache()
         self._statestack = []
+        self._aliased = set()   # state vars whose current value is also referenced elsewhere
         self._vars = []
+        self._template = None   # the default namespace (built on the first reset)
+        self._presets = {}      # var() values to use in place of the defaults (see run.sweep)
 
         self._resetContext()     # initialize default graphics state
         self._resetEnvironment() # initialize namespace & canvas
@@ -52,10 +58,7 @@ class Context(object):
 
         # clean out the namespace. include just the plotdevice commands/types
         self._ns.clear()
-        self._ns.update( (a,getattr(util,a)) for a in util.__all__  )
-        self._ns.update( (a,getattr(gfx,a)) for a in gfx.__all__  )
-        self._ns.update( (a,getattr(self,a)) for a in dir(self) if not a.startswith('_') )
-        self._ns["_ctx"] = self
+        self._ns.update(self._namespace())
 
         # clear the canvas and reset the dims/background
         self.canvas.reset()
@@ -66,9 +69,29 @@ class Context(object):
         # keep track of non-px canvas units
         self._grid = GridUnits(px, 1, Transform(), Transform())
 
+        # revalidate any remote images on their first use in the new run
+        util.readers.FETCHER.reset()
+
+        # re-parse data files the first time they're read in the new run
+        self._readcache.clear()
+
         # default output colorspace
         self._outputmode = RGB
 
+    def _namespace(self):
+        """Returns the commands, types, and constants every script starts out with.
+
+        The bound methods and module-level values are only collected once per Context
+        since they're the same for every run."""
+        if self._template is None:
+            ns = {}
+            ns.update( (a,getattr(util,a)) for a in util.__all__  )
+            ns.update( (a,getattr(gfx,a)) for a in gfx.__all__  )
+            ns.update( (a,getattr(self,a)) for a in dir(self) if not a.startswith('_') )
+            ns["_ctx"] = self
+            self._template = ns
+        return self._template
+
     def _resetContext(self):
         """Do a thorough reset of all the state variables"""
         self._activate()
@@ -104,21 +127,37 @@ class Context(object):
         self._oldvars = self._vars
         self._vars = []
 
+        # all of the above are fresh objects that no saved state refers to
+        self._aliased = set()
+
     def _saveContext(self):
-        cached = [_copy_attr(getattr(self, v)) for v in Context._state_vars]
-        self._statestack.insert(0, cached)
+        # the snapshot shares its values with the current state rather than copying them. the
+        # mutable ones are marked as shared so they'll be copied before their next change
+        # (except for the in-progress path, which is rarely set and changed too often to track)
+        cached = tuple(_copy_attr(self._path) if v=='_path' else getattr(self, v) for v in Context._state_vars)
+        self._statestack.append(cached)
+        self._aliased.update(Context._mutable_vars)
         self.clear()
 
     def _restoreContext(self):
         try:
-            cached = self._statestack.pop(0)
+            cached = self._statestack.pop()
         except IndexError:
             raise DeviceError, "Too many Context._restoreContext calls."
 
         for attr, val in zip(Context._state_vars, cached):
             setattr(self, attr, val)
+        self._aliased.update(Context._mutable_vars) # other snapshots may still refer to them
         self.canvas.unit = self._grid.unit
 
+    def _own(self, attr):
+        """Returns the value of a mutable state var, copying it first if it's currently shared
+        with a saved state or grob (and thus can't be modified in place)"""
+        if attr in self._aliased:
+            setattr(self, attr, _copy_attr(getattr(self, attr)))
+            self._aliased.discard(attr)
+        return getattr(self, attr)
+
     def ximport(self, libName):
         lib = __import__(libName)
         self._ns[libName] = lib
@@ -549,17 +588,17 @@ class Context(object):
         """Legacy command. Equivalent to: `with transform():`
 
         Saves the transform state to be restored by a subsequent pop()"""
-        self._transformstack.insert(0, self._transform.matrix)
+        self._own('_transformstack').append(self._transform)
+        self._aliased.add('_transform')
 
     def pop(self):
         """Legacy command. Equivalent to: `with transform():`
 
         Restores the transform to the saved state from a prior push()"""
-        try:
-            self._transform = Transform(self._transformstack[0])
-            del self._transformstack[0]
-        except IndexError, e:
+        if not self._transformstack:
             raise DeviceError, "pop: too many pops!"
+        self._transform = self._own('_transformstack').pop()
+        self._aliased.add('_transform')
 
     def transform(self, mode=None, matrix=None):
         """Change the transform mode or begin a `with`-statement-scoped set of transformations
@@ -607,7 +646,8 @@ class Context(object):
             raise DeviceError(badmode)
 
         rollback = {"_transformmode":self._transformmode,
-                    "_transform":self._transform.copy()}
+                    "_transform":self._transform}
+        self._aliased.add('_transform')
 
         if mode:
             self._transformmode = mode
@@ -622,20 +662,31 @@ class Context(object):
     def reset(self):
         """Discard any accumulated transformations from prior calls to translate, scale, rotate, or skew"""
         xf = self._transform.inverse
-        xf._rollback = {'_transform':self._transform.copy()}
+        xf._rollback = {'_transform':self._transform}
         self._transform = Transform()
+        self._aliased.discard('_transform')
+        return xf
+
+    def _retransform(self, method, *args, **kwargs):
+        # apply the change to a new copy of the current transform, leaving the prior one intact
+        # to be shared by the returned Transform's _rollback (and any saved states)
+        prior = self._transform
+        self._transform = prior.copy()
+        self._aliased.discard('_transform')
+        xf = getattr(self._transform, method)(*args, **kwargs)
+        xf._rollback = {'_transform':prior}
         return xf
 
     def translate(self, x=0, y=0):
         """Shift subsequent drawing operations by (x,y)"""
-        return self._transform.translate(x,y, rollback=True)
+        return self._retransform('translate', x, y)
 
     def scale(self, x=1, y=None):
         """Scale subsequent drawing operations by x- and y-factors
 
         When called with one argument, the factor will be applied to the x & y axes evenly.
         """
-        return self._transform.scale(x,y, rollback=True)
+        return self._retransform('scale', x, y)
 
     def skew(self, x=0, y=0):
         """Applies a 1- or 2-axis skew distortion to subsequent drawing operations
@@ -645,7 +696,7 @@ class Context(object):
 
         When called with only one argument, the skew will be purely horizontal.
         """
-        return self._transform.skew(x,y, rollback=True)
+        return self._retransform('skew', x, y)
 
     def rotate(self, theta=None, **kwargs):
         """Rotate subsequent drawing operations
@@ -659,7 +710,7 @@ class Context(object):
         """
         if theta is not None:
             kwargs[self._thetamode] = theta
-        return self._transform.rotate(rollback=True, **kwargs)
+        return self._retransform('rotate', **kwargs)
 
     ### Ink Commands ###
 
@@ -761,6 +812,7 @@ class Context(object):
         clr = Color(None)
         setattr(clr, '_rollback', dict(fill=self._fillcolor))
         self._fillcolor = None
+        self._aliased.discard('_fillcolor')
         return clr
 
     def fill(self, *args, **kwargs):
@@ -805,13 +857,15 @@ class Context(object):
                 clr = Color(*args)
             setattr(clr, '_rollback', dict(fill=self._fillcolor))
             self._fillcolor = clr
-        return self._fillcolor
+            self._aliased.discard('_fillcolor')
+        return self._own('_fillcolor')
 
     def nostroke(self):
         """Set the stroke color to None"""
         clr = Color(None)
         setattr(clr, '_rollback', dict(fill=self._strokecolor))
         self._strokecolor = None
+        self._aliased.discard('_strokecolor')
         return clr
 
     def stroke(self, *args):
@@ -834,7 +888,8 @@ class Context(object):
             annotated = Color(*args)
             setattr(annotated, '_rollback', dict(stroke=self._strokecolor))
             self._strokecolor = annotated
-        return self._strokecolor
+            self._aliased.discard('_strokecolor')
+        return self._own('_strokecolor')
 
     ### Pen Commands ###
 
@@ -921,7 +976,7 @@ class Context(object):
         eff = Effect(alpha=a, rollback=True)
         if a==1.0:
             a = None
-        self._effects.alpha = a
+        self._own('_effects').alpha = a
         return eff
 
     def blend(self, *arg):
@@ -956,7 +1011,7 @@ class Context(object):
         eff = Effect(blend=mode, rollback=True)
         if mode=='normal':
             mode = None
-        self._effects.blend = mode
+        self._own('_effects').blend = mode
         return eff
 
     def noshadow(self):
@@ -988,7 +1043,7 @@ class Context(object):
 
         s = None if None in args else Shadow(*args, **kwargs)
         eff = Effect(shadow=s, rollback=True)
-        self._effects.shadow = s
+        self._own('_effects').shadow = s
         return eff
 
     @contextmanager
@@ -1189,9 +1244,9 @@ class Context(object):
             It acts as a dictionary with all currently defined styles as its keys.
         """
         if name is None:
-            return self._stylesheet
+            return self._own('_stylesheet')
         else:
-            return self._stylesheet.style(name, *args, **kwargs)
+            return self._own('_stylesheet').style(name, *args, **kwargs)
 
     def text(self, *args, **kwargs):
         """Draw a single line (or a block) of text
@@ -1300,6 +1355,10 @@ class Context(object):
           txt.folio - the "page number" of the object (typically counting from one)
           txt.pg - the index of the object in the series (counting from zero)
 
+        The string is only laid out once: each page after the first is a `view' that
+        shares the original Text's storage (see Text.overleaf) so long documents can
+        be paginated without copying their contents for every page.
+
         Additional Keyword Args:
           - `folio` sets the "page number" of the first page in the sequence – accessible
              through its corresponding .folio attribute. Defaults to 1 if omitted.
@@ -1359,6 +1418,27 @@ class Context(object):
         img = Image(path, data=data)
         return img.size
 
+    def prefetch(self, paths, ahead=None):
+        """Begin loading a list of image files or urls in the background
+
+        Returns a list of the paths. Subsequent calls to image() will use the prefetched
+        data rather than reading from disk or the network (and if a file is still being
+        decoded, they'll wait for it to finish).
+
+        Keyword Args:
+          - `ahead`: when set to an integer, only that many images will be loaded at once.
+            The remaining paths are queued up as you iterate through the list, e.g.,
+                for pth in prefetch(files('photos/*.jpg'), ahead=4):
+                    image(pth, 0,0)
+        """
+        if isinstance(paths, basestring):
+            paths = [paths]
+        if ahead:
+            return Lookahead(paths, ahead)
+        paths = list(paths)
+        self._imagecache.prefetch(paths)
+        return paths
+
     ### draw, erase, and save-to-file ###
 
     def _should_plot(self, opts):
@@ -1552,6 +1632,23 @@ class Context(object):
             badtype = "measure() can only handle Text, Images, Beziers, and file() objects (got %s)"%type(obj)
             raise DeviceError(badtype)
 
+    ### Data files ###
+
+    def read(self, pth, *args, **kwargs):
+        """Returns the contents of a file or url as a string or format-dependent data type
+
+        Accepts the same arguments as plotdevice.util.read() but remembers the parsed result
+        for the remainder of the run. Subsequent calls with the same path and options (e.g.,
+        from within an animation's draw() function) will return the same data without
+        re-reading the file unless it has been modified in the interim. Since it's shared
+        between calls, the result is read-only.
+
+        Keyword Args:
+          - `copy`: pass True to get a private copy of the data that can be modified in place
+          - `cache`: pass False to bypass the memoized copy and read the file from scratch
+        """
+        return self._readcache.read(pth, *args, **kwargs)
+
     ### Variables ###
 
     def var(self, name, type, default=None, min=0, max=100, value=None):
@@ -1560,10 +1657,12 @@ class Context(object):
 
     def addvar(self, v):
         oldvar = self.findvar(v.name)
-        if oldvar is not None:
+        if v.name in self._presets:
+            v.value = v.sanitize(self._presets[v.name])
+        elif oldvar is not None:
             if oldvar.compliesTo(v):
                 v.value = oldvar.value
-        self._vars.append(v)
+        self._own('_vars').append(v)
         self._ns[v.name] = v.value
 
     def findvar(self, name):
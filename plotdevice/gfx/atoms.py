@@ -63,6 +63,7 @@ class Grob(object):
     """A GRaphic OBject is the base class for all drawing primitives."""
     __metaclass__ = Bequest
     ctxAttrs = ('_grid',)
+    mutableAttrs = ('_effects', '_transform', '_fillcolor', '_strokecolor', '_stylesheet')
 
     def __init__(self, **kwargs):
         self.inherit() # copy over every _ctx attribute we're interested in
@@ -79,12 +80,29 @@ class Grob(object):
         return self.__class__(self)
 
     def inherit(self, src=None):
-        """Fills in attributes drawn from the _ctx (at init time) or another grob (to make a copy)."""
+        """Fills in attributes drawn from the _ctx (at init time) or another grob (to make a copy).
+
+        Style attrs are shared with the source rather than copied. The ones that can be modified
+        in place are marked as shared on both sides and will be copied by whichever one changes
+        first (see _own)."""
         if src is None:
             src, attrs = _ctx, self._inherit
         else:
             attrs = set(src._state).intersection(self._state)
-        _copy_attrs(src, self, attrs)
+        styles = attrs.intersection(self._inherit)
+        for attr in styles:
+            setattr(self, attr, getattr(src, attr))
+        _copy_attrs(src, self, attrs.difference(styles))
+
+        self._aliased = styles.intersection(Grob.mutableAttrs)
+        src._aliased.update(self._aliased)
+
+    def _own(self, attr):
+        """Returns the value of a style attr, first making a private copy if it's shared"""
+        if attr in self._aliased:
+            setattr(self, attr, _copy_attr(getattr(self, attr)))
+            self._aliased.discard(attr)
+        return getattr(self, attr)
 
     def update(self, mapping=None, **kwargs):
         """Assign new values to one or more properties
@@ -135,24 +153,24 @@ class EffectsMixin(Grob):
     @property
     def effects(self):
         """An Effect object merging inherited alpha/blend/shadow with local overrides"""
-        return self._effects
+        return self._own('_effects')
 
     def _get_alpha(self):
         return self._effects.alpha
     def _set_alpha(self, a):
-        self._effects.alpha = a
+        self._own('_effects').alpha = a
     alpha = property(_get_alpha, _set_alpha)
 
     def _get_blend(self):
         return self._effects.blend
     def _set_blend(self, mode):
-        self._effects.blend = mode
+        self._own('_effects').blend = mode
     blend = property(_get_blend, _set_blend)
 
     def _get_shadow(self):
         return self._effects.shadow
     def _set_shadow(self, spec):
-        self._effects.shadow = spec
+        self._own('_effects').shadow = spec
     shadow = property(_get_shadow, _set_shadow)
 
 class FrameMixin(Grob):
@@ -221,15 +239,17 @@ class ColorMixin(Grob):
                 setattr(self, attr, kwargs[attr])
 
     def _get_fill(self):
-        return self._fillcolor
+        return self._own('_fillcolor')
     def _set_fill(self, *args):
         self._fillcolor = None if args[0] is None else Color(*args)
+        self._aliased.discard('_fillcolor')
     fill = property(_get_fill, _set_fill)
 
     def _get_stroke(self):
-        return self._strokecolor
+        return self._own('_strokecolor')
     def _set_stroke(self, *args):
         self._strokecolor = None if args[0] is None else Color(*args)
+        self._aliased.discard('_strokecolor')
     stroke = property(_get_stroke, _set_stroke)
 
 class TransformMixin(Grob):
@@ -250,29 +270,31 @@ class TransformMixin(Grob):
     transformmode = property(_get_transformmode, _set_transformmode)
 
     def _get_transform(self):
-        return self._transform
+        return self._own('_transform')
     def _set_transform(self, transform):
         self._transform = Transform(transform)
+        self._aliased.discard('_transform')
     transform = property(_get_transform, _set_transform)
 
     def translate(self, x=0, y=0):
-        self._transform.translate(x,y)
+        self._own('_transform').translate(x,y)
         return self
 
     def rotate(self, arg=None, **opts):
-        self._transform.rotate(arg, **opts)
+        self._own('_transform').rotate(arg, **opts)
         return self
 
     def scale(self, x=1, y=None):
-        self._transform.scale(x,y)
+        self._own('_transform').scale(x,y)
         return self
 
     def skew(self, x=0, y=0):
-        self._transform.skew(x,y)
+        self._own('_transform').skew(x,y)
         return self
 
     def reset(self):
         self._transform = Transform()
+        self._aliased.discard('_transform')
         return self
 
 
@@ -351,7 +373,7 @@ class StyleMixin(Grob):
         if not isinstance(fontargs, (list,tuple)):
             fontargs = [fontargs]
 
-        spec = self.stylesheet._styles.get( opts.get('style'), {} )
+        spec = self._stylesheet._styles.get( opts.get('style'), {} )
         spec.update(fontspec(*fontargs, **fontopts))
         if 'fill' in opts:
             spec['fill'] = Color(opts['fill'])
@@ -383,11 +405,11 @@ class StyleMixin(Grob):
 
     @property
     def stylesheet(self):
-        return self._stylesheet
+        return self._own('_stylesheet')
 
     @property
     def fill(self):
-        return self._fillcolor
+        return self._own('_fillcolor')
 
 class Variable(object):
     def __init__(self, name, type, default=None, min=0, max=100, value=None):
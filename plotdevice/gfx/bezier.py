@@ -1,5 +1,7 @@
 # encoding: utf-8
 import warnings
+from functools import wraps
+from itertools import count
 from ..lib.cocoa import *
 from math import pi, sin, cos, sqrt
 
@@ -40,15 +42,26 @@ _CAPSTYLE={BUTT:kCGLineCapButt, ROUND:kCGLineCapRound, SQUARE:kCGLineCapSquare}
 NORMAL = "normal"
 FORTYFIVE = "fortyfive"
 
+# every change to a path's points gives it a new version number (see Stencil._clip_path)
+_revisions = count()
+
+def _mutates(method):
+    @wraps(method)
+    def mutator(self, *args, **kwargs):
+        self._version = next(_revisions)
+        return method(self, *args, **kwargs)
+    return mutator
+
 class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
     """A Bezier provides a wrapper around NSBezierPath."""
-    stateAttrs = ('_nsBezierPath', '_fulcrum')
+    stateAttrs = ('_nsBezierPath', '_fulcrum', '_version')
     opts = ('close', 'smooth')
 
     def __init__(self, path=None, **kwargs):
         super(Bezier, self).__init__(**kwargs)
         self._segment_cache = {} # used by pathmatics
         self._fulcrum = None # centerpoint (set only for center-based primitives)
+        self._version = next(_revisions) # shared by copies until one of them is modified
 
         # path arg might contain a list of point tuples, a bezier to copy, or a raw
         # nsbezier reference to use as the backing store. otherwise start with a
@@ -83,6 +96,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
         self._autoclose()
         for attr, val in self._rollback.items():
             setattr(_ctx, attr, val)
+        _ctx._aliased.add('_transform') # grobs drawn before the block may share it
 
     def copy(self):
         clone = Bezier()
@@ -91,18 +105,22 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
 
     ### Path methods ###
 
+    @_mutates
     def moveto(self, x, y):
         self._nsBezierPath.moveToPoint_( (x, y) )
 
+    @_mutates
     def lineto(self, x, y):
         if self._nsBezierPath.elementCount()==0:
             # use an implicit 0,0 origin if path doesn't have a prior moveto
             self._nsBezierPath.moveToPoint_( (0, 0) )
         self._nsBezierPath.lineToPoint_( (x, y) )
 
+    @_mutates
     def curveto(self, x1, y1, x2, y2, x3, y3):
         self._nsBezierPath.curveToPoint_controlPoint1_controlPoint2_( (x3, y3), (x1, y1), (x2, y2) )
 
+    @_mutates
     def arcto(self, x1, y1, x2=None, y2=None, radius=None, ccw=False):
         if x2 is not None and y2 is not None:
             # arc toward the x1,y1 control point then turn toward the x2,y2 dest point. round off the
@@ -134,6 +152,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
             p.transformUsingAffineTransform_(t._nsAffineTransform)
             self.extend(Bezier(p)[1:]) # omit the initial moveto in the semicircle
 
+    @_mutates
     def closepath(self):
         self._nsBezierPath.closePath()
 
@@ -144,6 +163,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
 
     ### Basic shapes (origin + size) ###
 
+    @_mutates
     def rect(self, x, y, width, height, radius=None):
         if radius is None:
             self._nsBezierPath.appendBezierPathWithRect_( ((x, y), (width, height)) )
@@ -155,6 +175,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
                 raise DeviceError(badradius)
             self._nsBezierPath.appendBezierPathWithRoundedRect_xRadius_yRadius_( ((x,y), (width,height)), *radius)
 
+    @_mutates
     def oval(self, x, y, width, height, rng=None, ccw=False, close=False):
         # range = None:      draw a full ellipse
         # range = 180:       draws a semicircle
@@ -184,6 +205,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
             self._fulcrum = Point(x+width/2, y+width/2)
     ellipse = oval
 
+    @_mutates
     def line(self, x1, y1, x2, y2, ccw=None):
         if ccw in (True, False):
             self.moveto(x1,y1)
@@ -194,6 +216,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
 
     ### Radial shapes (center + radius) ###
 
+    @_mutates
     def poly(self, x, y, radius, sides=4, points=None):
         # if `points` is defined, draw a regularized star, otherwise draw
         # a regular polygon with the given number of `sides`.
@@ -226,6 +249,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
         self._nsBezierPath.closePath()
         self._fulcrum = Point(x,y)
 
+    @_mutates
     def arc(self, x, y, r, rng=None, ccw=False, close=False):
         if not rng:
             self.oval(x-r, y-r, 2*r, 2*r)
@@ -247,6 +271,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
             self._nsBezierPath.closePath()
         self._fulcrum = Point(x,y)
 
+    @_mutates
     def star(self, x, y, points=20, outer=100, inner=None):
         # if inner radius is unspecified, default to half-size
         if inner is None:
@@ -261,6 +286,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
         self.closepath()
         self._fulcrum = Point(x,y)
 
+    @_mutates
     def arrow(self, x, y, width=100, type=NORMAL):
         if type not in (NORMAL, FORTYFIVE):
             badtype = "available types for arrow() are NORMAL and FORTYFIVE"
@@ -376,7 +402,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
 
         xf = Transform()
         xf.prepend(nudge)
-        xf.prepend(self.transform)
+        xf.prepend(self._transform)
         xf.prepend(nudge.inverse)
         return xf
 
@@ -391,7 +417,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
             self._screen_transform.concat()
 
             # apply blend/alpha/shadow (and any associated transparency layers)
-            with self.effects.applied():
+            with self._effects.applied():
                 # prepare to stroke, fill, or both
                 ink = None
                 if isinstance(self._fillcolor, Color):
@@ -418,6 +444,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
 
     ### Geometry ###
 
+    @_mutates
     def fit(self, x=None, y=None, width=None, height=None, stretch=False):
 
         """Fits this path to the specified bounds.
@@ -501,6 +528,7 @@ class Bezier(EffectsMixin, TransformMixin, ColorMixin, PenMixin, Grob):
         for i in xrange(count):
             yield pathmatics.point(self, delta*i)
 
+    @_mutates
     def addpoint(self, t):
         self._nsBezierPath = pathmatics.insert_point(self, t)._nsBezierPath
 
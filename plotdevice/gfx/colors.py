@@ -17,7 +17,14 @@ HSV = HSB = "hsv"
 CMYK = "cmyk"
 GREY = "greyscale"
 
-_CSS_COLORS = json.load(open(rsrc_path('colors.json')))
+_CSS_COLORS = None # name -> hex string (loaded on first use)
+
+def css_colors():
+    """Returns a dictionary mapping css color names to their hex values"""
+    global _CSS_COLORS
+    if _CSS_COLORS is None:
+        _CSS_COLORS = json.load(open(rsrc_path('colors.json')))
+    return _CSS_COLORS
 
 class Color(object):
 
@@ -100,6 +107,7 @@ class Color(object):
         for param, val in self._rollback.items():
             statevar = {"fill":"_fillcolor", "stroke":"_strokecolor"}[param]
             setattr(_ctx, statevar, val)
+            _ctx._aliased.add(statevar) # grobs drawn before the block may share it
 
     @property
     def nsColor(self):
@@ -300,7 +308,7 @@ class Color(object):
         if isinstance(blob, Color):
             return True
 
-        valid_str = lambda s: isinstance(s, basestring) and (s.strip() in _CSS_COLORS or \
+        valid_str = lambda s: isinstance(s, basestring) and (s.strip() in css_colors() or \
                                                              re.match(r'#?[a-z0-9]{3,8}$', s.strip()) )
         if isinstance(blob, (tuple, list)):
             demoded = [b for b in blob if b not in (RGB,HSV,CMYK,GREY)]
@@ -328,8 +336,8 @@ class Color(object):
         """Returns an r/g/b/a tuple based on a css color name or a hex string of the form:
         RRGGBBAA, RRGGBB, RGBA, or RGB (with or without a leading #)
         """
-        if clrstr in _CSS_COLORS: # handle css color names
-            clrstr = _CSS_COLORS[clrstr]
+        if clrstr in css_colors(): # handle css color names
+            clrstr = css_colors()[clrstr]
 
         if re.search(r'#?[0-9a-f]{3,8}', clrstr): # rgb & rgba hex strings
             hexclr = clrstr.lstrip('#')
@@ -366,6 +374,7 @@ class Pattern(object):
         for param, val in self._rollback.items():
             statevar = {"fill":"_fillcolor", "stroke":"_strokecolor"}[param]
             setattr(_ctx, statevar, val)
+            _ctx._aliased.add(statevar) # grobs drawn before the block may share it
 
     def set(self):
         self._nsColor.set()
@@ -423,6 +432,7 @@ class Gradient(object):
         for param, val in self._rollback.items():
             statevar = {"fill":"_fillcolor", "stroke":"_strokecolor"}[param]
             setattr(_ctx, statevar, val)
+            _ctx._aliased.add(statevar) # grobs drawn before the block may share it
 
     def __repr__(self):
         return 'Gradient(%s, steps=%r)'%(", ".join('%r'%c for c in self._colors), self._steps)
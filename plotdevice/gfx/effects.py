@@ -1,6 +1,7 @@
 # encoding: utf-8
 import os
 import re
+from collections import OrderedDict
 from contextlib import contextmanager
 from ..lib.cocoa import *
 
@@ -112,7 +113,7 @@ class Effect(Frob):
         # reset the global per-object effects state within the block (since the effects
         # will be applied to a transparency layer encapsulating all drawing)
         for eff in self._fx:
-            _ctx._effects._fx.pop(eff, None)
+            _ctx._own('_effects')._fx.pop(eff, None)
         return
 
     def __exit__(self, type, value, tb):
@@ -121,7 +122,7 @@ class Effect(Frob):
 
         # restore the per-object effects state to what it was before the `with` block
         for eff, val in self._rollback.items():
-            setattr(_ctx._effects, eff, val)
+            setattr(_ctx._own('_effects'), eff, val)
         del self._rollback
 
     def set(self, *effs):
@@ -302,25 +303,67 @@ class Stencil(Frob):
         port = _cg_port()
 
         if hasattr(self, 'path'):
-            path_xf = self.path._screen_transform
-            cg_path = path_xf.apply(self.path).cgPath
             CGContextBeginPath(port)
+            CGContextAddPath(port, self._clip_path)
             if self.evenodd:
-                # if inverted, knock the path out of a full-screen rect and clip with that
-                CGContextAddRect(port, ((0,0),(_ctx.WIDTH, _ctx.HEIGHT)))
-                CGContextAddPath(port, cg_path)
                 CGContextEOClip(port)
             else:
-                # otherwise just color between the lines
-                CGContextAddPath(port, cg_path)
                 CGContextClip(port)
 
         elif hasattr(self, 'bmp'):
+            cg_mask = self._mask
+
+            # the mask is sitting at (0,0) until transformed to screen coords
+            xf = self.bmp._screen_transform
+            xf.concat() # apply transforms before clipping...
+            CGContextClipToMask(port, ((0,0), self.bmp.size), cg_mask)
+            xf.inverse.concat() # ...restore the previous state after
+
+    @property
+    def _clip_path(self):
+        """Returns the cg-path for a Bezier or Text stencil (converting it if necessary)
+
+        Paths are memoized by their version, screen transform, and canvas units so clipping
+        to the same shape in successive frames (or via copies of the same Bezier) can skip
+        the transformation and conversion steps.
+        """
+        path_xf = self.path._screen_transform
+        knockout = (_ctx.WIDTH, _ctx.HEIGHT) if self.evenodd else None
+        key = (self.path._version, tuple(path_xf.matrix), self.path._grid.dpx, knockout)
+        cg_path = _clip_paths.pop(key, None)
+        if cg_path is None:
+            cg_path = path_xf.apply(self.path).cgPath
+            if knockout:
+                # if inverted, knock the path out of a full-screen rect and clip with that
+                outer = CGPathCreateMutable()
+                CGPathAddRect(outer, None, ((0,0), knockout))
+                CGPathAddPath(outer, None, cg_path)
+                cg_path = outer
+
+        # move the path to the most-recently-used end and drop the oldest if over the limit
+        _clip_paths[key] = cg_path
+        if len(_clip_paths) > CLIP_CACHE_SIZE:
+            _clip_paths.popitem(last=False)
+        return cg_path
+
+    @property
+    def _mask(self):
+        """Returns the ‘imagemask’ cg-image for a bitmap stencil (compiling it if necessary)
+
+        Masks are stored in the image cache keyed by the source image's cache key (its path, url,
+        or a hash of its data), channel, inversion, and size so repeated draws (e.g., in an
+        animation) only run the filter chain once. Masks of images the cache didn't load (such
+        as Image.from_array buffers, whose pixels can change between draws) are rebuilt each time.
+        """
+        cache = _ctx._imagecache
+        src = cache.source(self.bmp._nsImage)
+        key = ('mask', src, self.channel, self.invert, tuple(self.bmp.size))
+        cg_mask = cache.get(key) if src is not None else None
+        if cg_mask is None:
             # run the filter chain and render to a cg-image
             singlechannel = ciFilter(self.channel, self.bmp._ciImage)
             greyscale = ciFilter(self.invert, singlechannel)
-            ci_ctx = CIContext.contextWithOptions_(None)
-            maskRef = ci_ctx.createCGImage_fromRect_(greyscale, ((0,0), self.bmp.size))
+            maskRef = _ci_context().createCGImage_fromRect_(greyscale, ((0,0), self.bmp.size))
 
             # turn the image into an ‘imagemask’ cg-image
             cg_mask = CGImageMaskCreate(CGImageGetWidth(maskRef),
@@ -329,12 +372,10 @@ class Stencil(Frob):
                                         CGImageGetBitsPerPixel(maskRef),
                                         CGImageGetBytesPerRow(maskRef),
                                         CGImageGetDataProvider(maskRef), None, False);
-
-            # the mask is sitting at (0,0) until transformed to screen coords
-            xf = self.bmp._screen_transform
-            xf.concat() # apply transforms before clipping...
-            CGContextClipToMask(port, ((0,0), self.bmp.size), cg_mask)
-            xf.inverse.concat() # ...restore the previous state after
+            nbytes = CGImageGetBytesPerRow(maskRef) * CGImageGetHeight(maskRef)
+            if src is not None:
+                cache.put(key, cg_mask, nbytes=nbytes, source=src)
+        return cg_mask
 
     @contextmanager
     def applied(self):
@@ -347,6 +388,17 @@ class ClippingPath(Stencil):
 
 ### core-image filters for channel separation and inversion ###
 
+CLIP_CACHE_SIZE = 256
+_clip_paths = OrderedDict() # (path version, transform, dpx, knockout) -> CGPath
+
+_ci_ctx = None
+def _ci_context():
+    """Returns a CIContext shared by all the stencils (creating it on first use)"""
+    global _ci_ctx
+    if _ci_ctx is None:
+        _ci_ctx = CIContext.contextWithOptions_(None)
+    return _ci_ctx
+
 def ciFilter(opt, img):
     _filt = _inversionFilter if isinstance(opt, bool) else _channelFilter
     return _filt(opt, img)
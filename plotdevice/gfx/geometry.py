@@ -523,7 +523,7 @@ class Transform(object):
         # the global state has already been changed before the context manager was
         # invoked, so don't re-apply it again here.
         if not hasattr(self, '_rollback'):
-            _ctx._transform.prepend(self)
+            _ctx._own('_transform').prepend(self)
 
     def __exit__(self, type, value, tb):
         # once we've been through a block the _rollback (if any) can be discarded
@@ -533,11 +533,12 @@ class Transform(object):
             # applying the inverse transform
             for attr, priorval in self._rollback.items():
                 setattr(_ctx, attr, priorval)
+            _ctx._aliased.add('_transform') # the prior transform may also be in a saved state or grob
             del self._rollback
             return
         else:
             # invert our changes to restore the context's transform
-            _ctx._transform.prepend(self.inverse)
+            _ctx._own('_transform').prepend(self.inverse)
 
     @trim_zeroes
     def __repr__(self):
@@ -677,13 +678,14 @@ class Transform(object):
         if isinstance(path, NSBezierPath):
             return self._nsAffineTransform.transformBezierPath_(path)
 
-        from .bezier import Bezier
+        from .bezier import Bezier, _revisions
         if isinstance(path, Bezier):
             path = path.copy()
         else:
             wrongtype = "Can only transform Beziers"
             raise DeviceError(wrongtype)
         path._nsBezierPath = self._nsAffineTransform.transformBezierPath_(path._nsBezierPath)
+        path._version = next(_revisions)
         return path
 
     def transformBezierPath(self, path):
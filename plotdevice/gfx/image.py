@@ -1,20 +1,34 @@
 # encoding: utf-8
 import os
 import re
+import objc
 import json
 import warnings
 import math
+import threading
+from hashlib import sha1
+from collections import OrderedDict
 from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 from ..lib.cocoa import *
 
 from plotdevice import DeviceError
 from ..util import _copy_attrs, autorelease
-from ..util.readers import HTTP, last_modified
+from ..util.readers import FETCHER
 from ..lib.io import MovieExportSession, ImageExportSession
 from .geometry import Region, Size, Point, Transform, CENTER
 from .atoms import TransformMixin, EffectsMixin, FrameMixin, Grob
 from . import _ns_context
 
+try:
+    import numpy
+except ImportError:
+    class Decoy(object):
+        def __getattr__(self, attr):
+            unsupported = 'could not find the "numpy" library (try running "pip install numpy" first)'
+            raise RuntimeError(unsupported)
+    numpy = Decoy()
+
 _ctx = None
 __all__ = ("Image", 'ImageWriter')
 
@@ -90,64 +104,76 @@ class Image(EffectsMixin, TransformMixin, FrameMixin, Grob):
                 if k in FrameMixin.opts:
                     setattr(self, k, v)
 
-    def _lazyload(self, path=None, data=None):
-        # loads either a `path` or `data` kwarg and returns an NSImage
-        # `path` should be the path of a valid image file
-        # `data` should be the bytestring contents of an image file, or base64-encoded
-        #        with the characters "base64," prepended to it
-        NSDataBase64DecodingIgnoreUnknownCharacters = 1
-        _cache = _ctx._imagecache
+    @classmethod
+    def from_array(cls, arr, *args, **kwargs):
+        """Create an Image whose pixels are read directly from a numpy array
 
-        if data is not None:
-            # convert the str into an NSData (possibly decoding along the way)
-            if isinstance(data, str) and data.startswith('base64,'):
-                data = NSData.alloc().initWithBase64EncodedString_options_(data[7:], NSDataBase64DecodingIgnoreUnknownCharacters)
-            elif not isinstance(data, NSData):
-                data = NSData.dataWithBytes_length_(data, len(data))
-            key, mtime, err_info = data.hash(), None, type(data)
+        The array should have a shape of (height, width) for greyscale images or
+        (height, width, 3|4) for RGB/RGBA. Arrays of uint8 are wrapped in place (so
+        later changes to the array will show up when the image is drawn) while
+        floating point arrays are scaled from 0-1 to 0-255 in a new buffer first.
+        Any remaining arguments are passed along to the Image constructor.
+        """
+        arr = numpy.asarray(arr)
+        if arr.ndim == 2:
+            arr = arr[:, :, numpy.newaxis]
+        if arr.ndim != 3 or arr.shape[2] not in (1, 3, 4):
+            badshape = "Image.from_array expects an array of shape (h, w), (h, w, 3), or (h, w, 4) (not %r)" % (arr.shape,)
+            raise DeviceError(badshape)
+        if arr.dtype.kind == 'f':
+            arr = (numpy.clip(arr, 0, 1) * 255).round().astype(numpy.uint8)
+        arr = numpy.ascontiguousarray(arr, dtype=numpy.uint8)
+
+        h, w, spp = arr.shape
+        space = NSDeviceWhiteColorSpace if spp == 1 else NSDeviceRGBColorSpace
+        rep = NSBitmapImageRep.alloc().initWithBitmapDataPlanes_pixelsWide_pixelsHigh_bitsPerSample_samplesPerPixel_hasAlpha_isPlanar_colorSpaceName_bitmapFormat_bytesPerRow_bitsPerPixel_(
+          (arr, None, None, None, None), w, h, 8, spp, spp==4, False, space, NSAlphaNonpremultipliedBitmapFormat, w*spp, 8*spp
+        )
+        nsImage = NSImage.alloc().initWithSize_(rep.size())
+        nsImage.addRepresentation_(rep)
+        nsImage.setFlipped_(True)
+        nsImage.setCacheMode_(NSImageCacheNever)
+        objc.setAssociatedObject(nsImage, _PIXELS, arr, objc.OBJC_ASSOCIATION_RETAIN) # keep the buffer alive
+
+        img = cls(nsImage, *args, **kwargs)
+        img._nsImage = nsImage # use the original rather than the constructor's (deep) copy
+        return img
 
-            # return a cached image if possible...
-            if key in _cache:
-                return _cache[key][0]
-            # ...or load from the data
-            image = NSImage.alloc().initWithData_(data)
-        elif path is not None:
-            if re.match(r'https?:', path):
-                # load from url
-                key = err_info = path
-                resp = HTTP.get(path)
-                mtime = last_modified(resp)
-                # return a cached image if possible...
-                if path in _cache and _cache[path][1] >= mtime:
-                    return _cache[path][0]
-                # ...or load from the data
-                bytes = resp.content
-                data = NSData.dataWithBytes_length_(bytes, len(bytes))
-                image = NSImage.alloc().initWithData_(data)
-            else:
-                # load from file path
-                try:
-                    path = NSString.stringByExpandingTildeInPath(path)
-                    mtime = os.path.getmtime(path)
-                    # return a cached image if possible...
-                    if path in _cache and _cache[path][1] >= mtime:
-                        return _cache[path][0]
-                except:
-                    notfound = 'Image "%s" not found.' % path
-                    raise DeviceError(notfound)
-                key = err_info = path
-                # ...or load from the file
-                image = NSImage.alloc().initWithContentsOfFile_(path)
+    @property
+    def pixels(self):
+        """A read-only numpy array viewing the image's bitmap data in place
+
+        The array's shape is (height, width, samples-per-pixel) and its values are the raw
+        8-bit samples in the order the bitmap stores them (see _nsBitmap.bitmapFormat() for
+        details on alpha placement and premultiplication). Since the pixels may be shared with
+        other Images loaded from the same source, modify a copy and pass it to from_array():
+            arr = img.pixels.copy()
+            arr[..., :3] = 255 - arr[..., :3]
+            inverted = Image.from_array(arr)
+        """
+        rep = objc.getAssociatedObject(self._nsImage, _RASTER)
+        if rep is None:
+            rep = self._nsBitmap
+            if rep not in self._nsImage.representations():
+                # vector images get rasterized once so the view has a stable buffer to point to
+                # (the bitmap is kept alongside the original, which is still what gets drawn)
+                objc.setAssociatedObject(self._nsImage, _RASTER, rep, objc.OBJC_ASSOCIATION_RETAIN)
+
+        if rep.isPlanar() or rep.bitsPerSample() != 8:
+            unsupported = "Image.pixels only supports 8-bit, non-planar bitmaps (not %i-bit%s)" % (rep.bitsPerSample(), ' planar' if rep.isPlanar() else '')
+            raise DeviceError(unsupported)
+        w, h, spp = rep.pixelsWide(), rep.pixelsHigh(), rep.samplesPerPixel()
+        stride, bpp = rep.bytesPerRow(), rep.bitsPerPixel() // 8
+        data = rep.bitmapData()
+        buf = data.as_buffer(stride * h) if hasattr(data, 'as_buffer') else data
+
+        arr = numpy.asarray(PixelBuffer(rep, buf, (h, w, spp), (stride, bpp, 1)))
+        arr.flags.writeable = False
+        return arr
 
-        # if we wound up with a valid image, configure and cache the NSImage
-        # before returning it
-        if image is None:
-            invalid = "Doesn't seem to contain image data: %r" % err_info
-            raise DeviceError(invalid)
-        image.setFlipped_(True)
-        image.setCacheMode_(NSImageCacheNever)
-        _cache[key] = (image, mtime)
-        return _cache[key][0]
+    def _lazyload(self, path=None, data=None):
+        # loads either a `path` or `data` kwarg and returns an NSImage (via the context's cache)
+        return _ctx._imagecache.load(path=path, data=data)
 
     @property
     def image(self):
@@ -229,11 +255,11 @@ class Image(EffectsMixin, TransformMixin, FrameMixin, Grob):
         if self._transformmode == CENTER:
             nudge.translate(w*factor/2, h*factor/2)
 
-        xf.translate(dx, dy)       # set the position before applying transforms
-        xf.prepend(nudge)          # nudge the image to its center (or not)
-        xf.prepend(self.transform) # add context's CTM.
-        xf.prepend(nudge.inverse)  # Move back to the real origin.
-        xf.scale(factor)           # scale to fit size constraints (if any)
+        xf.translate(dx, dy)        # set the position before applying transforms
+        xf.prepend(nudge)           # nudge the image to its center (or not)
+        xf.prepend(self._transform) # add context's CTM.
+        xf.prepend(nudge.inverse)   # Move back to the real origin.
+        xf.scale(factor)            # scale to fit size constraints (if any)
         return xf
 
     def _draw(self):
@@ -241,14 +267,387 @@ class Image(EffectsMixin, TransformMixin, FrameMixin, Grob):
 
         with _ns_context() as ns_ctx:
             self._screen_transform.concat() # move the image into place via transforms
-            with self.effects.applied():    # apply any blend/alpha/shadow effects
+            with self._effects.applied():   # apply any blend/alpha/shadow effects
                 ns_ctx.setImageInterpolation_(NSImageInterpolationHigh)
-                bounds = ((0,0), self._nsImage.size()) # draw the image at (0,0)
-                self._nsImage.drawAtPoint_fromRect_operation_fraction_((0,0), bounds, NSCompositeSourceOver, self.alpha)
+                nsImage = self._nsImage
+                port = ns_ctx.graphicsPort()
+                if ns_ctx.isDrawingToScreen() or CGBitmapContextGetWidth(port):
+                    # when rasterizing, use a downsampled copy if the image is being shrunk
+                    xf = CGContextGetUserSpaceToDeviceSpaceTransform(port)
+                    scale = math.sqrt(abs(xf.a*xf.d - xf.b*xf.c)) # device pixels per image point
+                    nsImage = _ctx._imagecache.level(nsImage, scale)
+                bounds = ((0,0), nsImage.size()) # draw the image at (0,0)
+                nsImage.drawAtPoint_fromRect_operation_fraction_((0,0), bounds, NSCompositeSourceOver, self.alpha)
                 # NB: the nodebox source warns about quartz bugs triggered by drawing
                 # EPSs to other origin points. no clue whether this still applies...
 
 
+_PIXELS = object() # association key for the arrays backing Image.from_array bitmaps
+_RASTER = object() # association key for the bitmaps backing vector images' Image.pixels
+
+class PixelBuffer(object):
+    """Exposes a bitmap's data to numpy (and keeps the NSBitmapImageRep alive while it's in use)"""
+    def __init__(self, rep, buf, shape, strides):
+        self.rep = rep
+        self.__array_interface__ = dict(version=3, typestr='|u1', data=buf, shape=shape, strides=strides)
+
+
+### size-limited storage for the NSImages loaded by Image objects ###
+
+class ImageCache(object):
+    """An LRU cache of the NSImages loaded by image() and Image()
+
+    Entries are keyed by path/url (or a hash of the data) and hang onto the source's modification
+    time so stale images will be reloaded. The cache estimates each image's decoded size and once
+    the total exceeds the `budget` (in bytes), the least-recently-used images are evicted.
+
+    If `cachedir` is set to a directory path, decoded bitmaps of local image files will also be
+    saved there (keyed by the file's path, mtime, and size) allowing subsequent runs (or other
+    processes) to skip the decoding step.
+
+    When not passed explicitly, the budget and cachedir are taken from the PLOTDEVICE_IMAGE_BUDGET
+    (in megabytes) and PLOTDEVICE_IMAGE_CACHE environment variables. The export worker and sweep
+    processes default to a cachedir in ~/Library/Caches/PlotDevice/images.
+
+    Entries derived from a cached image (e.g., mipmap levels or stencil masks) are keyed by the
+    source's key rather than the NSImage itself and are discarded along with it.
+
+    Images can be loaded in the background by passing a list of paths or urls to prefetch().
+    Subsequent calls to load() will only block if the image they're asking for is still in the
+    process of being decoded by one of the cache's worker threads.
+
+    The `hits`, `misses`, and `evictions` attributes count the cache's activity since its
+    creation (or the most recent call to clear).
+    """
+    budget = 512 * 1024 * 1024
+    workers = 4
+
+    def __init__(self, budget=None, cachedir=None):
+        if budget is None and os.environ.get('PLOTDEVICE_IMAGE_BUDGET'):
+            try:
+                budget = int(float(os.environ['PLOTDEVICE_IMAGE_BUDGET']) * 1024 * 1024)
+            except ValueError:
+                badbudget = "PLOTDEVICE_IMAGE_BUDGET should be a number of megabytes (not %r)" % os.environ['PLOTDEVICE_IMAGE_BUDGET']
+                raise DeviceError(badbudget)
+        self.budget = self.budget if budget is None else budget
+        self.cachedir = cachedir or os.environ.get('PLOTDEVICE_IMAGE_CACHE') or None
+        self._entries = OrderedDict() # key -> (NSImage, mtime, nbytes)
+        self._pending = {}            # key -> AsyncResult for in-progress prefetches
+        self._sources = {}            # id(NSImage) -> key for the images loaded by the cache
+        self._derived = {}            # key -> set of keys for the entries derived from it
+        self._pool = None
+        self._lock = threading.RLock()
+        self.clear()
+
+    def __repr__(self):
+        return "ImageCache(images=%i, bytes=%i, budget=%i)" % (len(self), self.nbytes, self.budget)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def clear(self):
+        """Discard all the cached images and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._sources.clear()
+            self._derived.clear()
+            self.nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, mtime=None):
+        """Returns the cached NSImage for `key' (or None if it's missing or older than `mtime')"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (mtime is not None and entry[1] < mtime):
+                if entry:
+                    self._discard(key)
+                self.misses += 1
+                return None
+
+            # move the entry to the most-recently-used end of the queue
+            self._entries[key] = self._entries.pop(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, image, mtime=None, nbytes=None, source=None):
+        """Add an NSImage to the cache (evicting older images if the budget has been exceeded)
+
+        Other kinds of images (e.g., the CGImages used as stencil masks) can be stored as well
+        so long as their size in bytes is passed as `nbytes`. If the image was derived from a
+        cached one, pass the original's key as `source` so it will be discarded along with it.
+        """
+        nbytes = decoded_size(image) if nbytes is None else nbytes
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (image, mtime, nbytes)
+            self.nbytes += nbytes
+            if source is not None:
+                self._derived.setdefault(source, set()).add(key)
+
+            # drop images from the least-recently-used end (but always keep the newest one)
+            while self.nbytes > self.budget and len(self._entries) > 1:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def source(self, image):
+        """Returns the key of an NSImage loaded by the cache (or None if it isn't one of ours)
+
+        Looking up an image also marks it as recently used since it's about to be drawn.
+        """
+        with self._lock:
+            key = self._sources.get(id(image))
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not image:
+                return None
+            self._entries[key] = self._entries.pop(key)
+            return key
+
+    def _discard(self, key):
+        # remove an entry (and anything derived from it) without counting it as an eviction
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.nbytes -= entry[2]
+        if self._sources.get(id(entry[0])) == key:
+            del self._sources[id(entry[0])]
+        for derived in self._derived.pop(key, ()):
+            self._discard(derived)
+
+    def load(self, path=None, data=None):
+        """Returns an NSImage for a file path, url, or bytestring (reusing a cached copy if possible)
+
+        `path` should be the path of a valid image file or an http(s) url
+        `data` should be the bytestring contents of an image file, or base64-encoded
+               with the characters "base64," prepended to it
+        """
+        if path is not None:
+            self.wait(self._key(path)) # let any in-progress prefetch finish first
+        return self._load(path, data)
+
+    def _load(self, path=None, data=None):
+        NSDataBase64DecodingIgnoreUnknownCharacters = 1
+
+        if data is not None:
+            # convert the str into an NSData (possibly decoding along the way)
+            if isinstance(data, str) and data.startswith('base64,'):
+                data = NSData.alloc().initWithBase64EncodedString_options_(data[7:], NSDataBase64DecodingIgnoreUnknownCharacters)
+            elif not isinstance(data, NSData):
+                data = NSData.dataWithBytes_length_(data, len(data))
+            key, mtime, err_info = data.hash(), None, type(data)
+
+            # return a cached image if possible...
+            image = self.get(key)
+            if image is not None:
+                return image
+            # ...or load from the data
+            image = NSImage.alloc().initWithData_(data)
+        elif path is not None:
+            key = err_info = path = self._key(path)
+
+            if re.match(r'https?:', path):
+                # load from url (revalidating the cached copy if we have one)
+                remote = FETCHER.get(path, cached=path in self)
+                # return a cached image if possible...
+                image = self.get(path, remote.mtime)
+                if image is not None:
+                    return image
+                if remote.content is None:
+                    remote = FETCHER.get(path) # our copy was evicted after validating it
+                # ...or load from the data
+                mtime, bytes = remote.mtime, remote.content
+                data = NSData.dataWithBytes_length_(bytes, len(bytes))
+                image = NSImage.alloc().initWithData_(data)
+            else:
+                # load from file path
+                try:
+                    mtime = os.path.getmtime(path)
+                    # return a cached image if possible...
+                    image = self.get(path, mtime)
+                    if image is not None:
+                        return image
+                    nbytes = os.path.getsize(path)
+                except:
+                    notfound = 'Image "%s" not found.' % path
+                    raise DeviceError(notfound)
+                # ...or load a previously decoded copy (or the file itself)
+                image = self.restore(path, mtime, nbytes)
+                if image is None:
+                    image = NSImage.alloc().initWithContentsOfFile_(path)
+                    if image is not None:
+                        self.persist(image, path, mtime, nbytes)
+
+        # if we wound up with a valid image, configure and cache the NSImage
+        # before returning it
+        if image is None:
+            invalid = "Doesn't seem to contain image data: %r" % err_info
+            raise DeviceError(invalid)
+        image.setFlipped_(True)
+        image.setCacheMode_(NSImageCacheNever)
+        with self._lock:
+            self.put(key, image, mtime)
+            self._sources[id(image)] = key
+        return image
+
+    def _key(self, path):
+        # urls are used verbatim but file paths are made absolute (since prefetching threads
+        # may outlive the script's working directory)
+        if re.match(r'https?:', path):
+            return path
+        return os.path.abspath(os.path.expanduser(path))
+
+    ### downsampled copies for drawing at reduced sizes ###
+
+    def level(self, image, scale):
+        """Returns the member of `image`'s mipmap pyramid best suited to drawing it at `scale`
+
+        The `scale` is the number of device pixels each of the image's points will cover. Bitmap
+        images being drawn at less than half their native resolution are swapped for a copy that
+        has been downsampled by the largest power of two that doesn't fall below that resolution.
+        Pyramid levels are built lazily (each from the one above it) and are stored in the cache
+        alongside their source image (counting toward the budget, evicted in LRU order, and
+        discarded along with the source). Only images loaded by the cache get levels since the
+        contents of others (e.g., Image.from_array buffers) can change between draws.
+        """
+        rep = image.representations()[0] if image.representations() else None
+        if not isinstance(rep, NSBitmapImageRep) or not scale > 0:
+            return image
+        src = self.source(image)
+        if src is None:
+            return image
+
+        # find the number of halvings that keeps at least `scale` device px per image px
+        w, h = rep.pixelsWide(), rep.pixelsHigh()
+        density = w / image.size().width
+        depth = int(math.floor(math.log(density / scale, 2)))
+        depth = min(depth, int(math.log(min(w, h), 2))) # stop at a 1px edge
+        if depth < 1:
+            return image
+
+        # walk down the pyramid, filling in any missing levels along the way
+        mip = image
+        for k in xrange(1, depth+1):
+            cached = self.get(('mip', src, k))
+            if cached is None:
+                cached = downsample(mip, w >> k, h >> k)
+                self.put(('mip', src, k), cached, source=src)
+            mip = cached
+        return mip
+
+    ### background decoding ###
+
+    def prefetch(self, paths):
+        """Begin loading a list of image paths and/or urls on the cache's thread pool"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self.workers)
+            for path in paths:
+                key = self._key(path)
+                if key in self._pending or key in self._entries:
+                    continue
+                self._pending[key] = self._pool.apply_async(self._prefetch, (key,))
+
+    def _prefetch(self, key):
+        try:
+            with autorelease():
+                image = self._load(path=key)
+                for rep in image.representations():
+                    if isinstance(rep, NSBitmapImageRep):
+                        rep.bitmapData() # force the pixels to be decompressed
+        except Exception:
+            pass # errors will be reported if the drawing thread asks for the image
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def wait(self, key):
+        """Block until a prefetch of the given path/url (if there is one) has completed"""
+        with self._lock:
+            pending = self._pending.get(key)
+        if pending:
+            pending.wait()
+
+    ### on-disk persistence ###
+
+    def _cachefile(self, path, mtime, nbytes):
+        digest = sha1(repr((path, mtime, nbytes))).hexdigest()
+        return os.path.join(os.path.expanduser(self.cachedir), '%s.tiff' % digest)
+
+    def restore(self, path, mtime, nbytes):
+        """Returns a previously saved NSImage for the given path/mtime/filesize (or None)"""
+        if self.cachedir:
+            cached = self._cachefile(path, mtime, nbytes)
+            if os.path.exists(cached):
+                return NSImage.alloc().initWithContentsOfFile_(cached)
+
+    def persist(self, image, path, mtime, nbytes):
+        """Save the decoded bitmap of an image file to the cachedir (if one has been set)
+
+        This is best-effort: if the bitmap can't be encoded or the cachedir isn't writable, the
+        image just gets decoded from its original file the next time around."""
+        if self.cachedir and any(isinstance(r, NSBitmapImageRep) for r in image.representations()):
+            cached = self._cachefile(path, mtime, nbytes)
+            try:
+                if not os.path.exists(os.path.dirname(cached)):
+                    os.makedirs(os.path.dirname(cached))
+                tiff = image.TIFFRepresentation()
+                if tiff is not None:
+                    tiff.writeToFile_atomically_(cached, True)
+            except (IOError, OSError):
+                pass
+
+class Lookahead(list):
+    """A list of image paths that keeps the next few prefetched as it's iterated over
+
+    While looping over the list, the `ahead` paths following the current one will be loaded
+    in the background by the context's ImageCache.
+    """
+    def __init__(self, paths, ahead=4):
+        super(Lookahead, self).__init__(paths)
+        self.ahead = ahead
+
+    def __iter__(self):
+        cache = _ctx._imagecache
+        cache.prefetch(self[:self.ahead])
+        for i, path in enumerate(list.__iter__(self)):
+            cache.prefetch(self[i+self.ahead : i+self.ahead+1])
+            yield path
+
+def downsample(image, width, height):
+    """Returns a copy of a bitmap NSImage resampled to the given pixel dimensions
+
+    The copy retains the original's size in points so it can be drawn in its place.
+    """
+    src = image.representations()[0]
+    rep = NSBitmapImageRep.alloc().initWithBitmapDataPlanes_pixelsWide_pixelsHigh_bitsPerSample_samplesPerPixel_hasAlpha_isPlanar_colorSpaceName_bytesPerRow_bitsPerPixel_(
+      None, width, height, 8, 4, True, False, NSDeviceRGBColorSpace, 0, 0
+    )
+    NSGraphicsContext.saveGraphicsState()
+    try:
+        ns_ctx = NSGraphicsContext.graphicsContextWithBitmapImageRep_(rep)
+        NSGraphicsContext.setCurrentContext_(ns_ctx)
+        ns_ctx.setImageInterpolation_(NSImageInterpolationHigh)
+        src.drawInRect_(((0,0), (width, height)))
+    finally:
+        NSGraphicsContext.restoreGraphicsState()
+    rep.setSize_(image.size())
+
+    copy = NSImage.alloc().initWithSize_(image.size())
+    copy.addRepresentation_(rep)
+    copy.setFlipped_(True)
+    copy.setCacheMode_(NSImageCacheNever)
+    return copy
+
+def decoded_size(image):
+    """Estimate the number of bytes an NSImage will occupy once its pixels have been decoded"""
+    w, h = image.size()
+    dims = [(rep.pixelsWide(), rep.pixelsHigh()) for rep in image.representations()]
+    pixels = [pw*ph for pw, ph in dims if pw > 0 and ph > 0] or [w*h] # fall back to points for vectors
+    return 4 * int(max(pixels))
+
+
 ### context manager for calls to `with export(...)` ###
 
 import time
@@ -1,6 +1,9 @@
 # encoding: utf-8
 import re
 import sys
+import weakref
+from functools import partial
+from bisect import bisect_left, bisect_right
 from collections import namedtuple
 from ..lib.cocoa import *
 
@@ -38,8 +41,32 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
     stateAttrs = ('_nodes', )
     opts = ('str', 'xml', 'src')
 
+    _shared = False # True for the page-views created by overleaf()
+    _overleaf = None # a weakref to the page returned by the most recent call to overleaf()
+    _snapshot = (None, None, u'') # (length, origin, text) of the most recent .text lookup
+
     def __init__(self, *args, **kwargs):
 
+        if args and isinstance(args[0], Text) and kwargs.get('overleaf'):
+            # pages created by overleaf() are views onto the original Text's storage & layout
+            # manager with a fresh set of containers following its last block. each page keeps
+            # the one before it alive since its position in the layout depends on the other's
+            orig = args[0]
+            self.inherit(orig)
+            self._shared = True
+            self._store, self._engine, self._nodes = orig._store, orig._engine, orig._nodes
+            self._node_index = orig._node_index
+            self._prev = orig
+            block = orig._blocks[-1]
+            self._blocks = []
+            for src in orig._blocks:
+                block = TextBlock(block)
+                block._parent = self
+                block.offset, block.size = src.offset, src.size
+                self._blocks.append(block)
+            self._held = [b._block for b in self._blocks]
+            return
+
         # assemble the NSMachinery
         self._engine = NSLayoutManager.alloc().init()
         self._engine.setUsesScreenFonts_(False)
@@ -52,10 +79,24 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
             # then bail out immediately (ignoring any other args)
             orig = args[0]
             self.inherit(orig)
+            self._node_index = {}
             self._blocks = [TextBlock(self) for f in orig._blocks]
             for src, dst in zip(orig._blocks, self._blocks):
                 dst.offset, dst.size = src.offset, src.size
-            self._store.appendAttributedString_(orig._store)
+
+            # copies of a page only include the characters from its page-break onward
+            origin = orig._origin
+            if not origin:
+                self._store.appendAttributedString_(orig._store)
+                return
+            self._store.appendAttributedString_(orig._store.attributedSubstringFromRange_((origin, len(orig))))
+            self._nodes = {tag:[e._replace(start=e.start-origin, end=e.end-origin) for e in elts if e.end > origin]
+                           for tag, elts in orig._nodes.items()}
+
+            # if the page-break is in the middle of a paragraph, preserve the first character's initial
+            # indentation (since otherwise it'll be treated as a `first' line of a new paragraph)
+            if len(self) and orig._store.string().substringWithRange_((origin-1, 1)) != u'\n':
+                Text._dedent(self._store, inherit=True)
             return
 
         # let the various mixins have a crack at the kwargs
@@ -64,8 +105,9 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
         # create a text block to manage layout and glyph-drawing
         self._blocks = [TextBlock(self)]
 
-        # maintain a lookup table of nodes within xml input
+        # maintain a lookup table of nodes within xml input (and an index for searching it)
         self._nodes = {}
+        self._node_index = {}
 
         # look for a string as the first positional arg or an xml/str kwarg
         if args and isinstance(args[0], basestring):
@@ -79,8 +121,8 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
         self.append(**{k:v for k,v in kwargs.items() if k in self.opts})
 
     def __repr__(self):
-        total = len(self.text)
-        displayed = sum(self.blocks[-1]._chars)
+        total = len(self)
+        displayed = sum(self.blocks[-1]._chars) - self._origin
         msg = 'chars=%i'%displayed
         if displayed < total:
             msg += ' overflow=%i'%(total-displayed)
@@ -104,8 +146,13 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
           parameters that are omitted the appended string will inherit the style of
           the Text object it's being added to.
         """
+        if self._shared:
+            shared = "Pages created by overleaf() share their text with the original (append to a copy() of the page instead)"
+            raise DeviceError(shared)
+
         is_xml = 'xml' in kwargs
         txt = kwargs.pop('xml', kwargs.pop('str', txt))
+        self._snapshot = Text._snapshot
         src = kwargs.pop('src', None)
         StyleMixin.validate(kwargs)
         attrib_txt = None
@@ -145,55 +192,82 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
             # if the text is xml, parse it an overlay any stylesheet entries that map to
             # its tag names. otherwise apply the merged style to the entire string
             if is_xml:
-                # find any tagged regions that need styling
-                parser = XMLParser(decoded, offset=len(self.text))
-
-                # update our internal lookup table of nodes
-                for tag, elts in parser.nodes.items():
-                    old_elts = self._nodes.get(tag, [])
-                    self._nodes[tag] = old_elts + elts
-
-                # start building the display-string (with all the tags now removed)
-                attrib_txt = NSMutableAttributedString.alloc().initWithString_(parser.text)
-
-                # generate the proper `ns' font attrs for each unique cascade of xml tags
-                attrs = {seq:self._fontify(merged_style, *seq) for seq in sorted(parser.regions)}
-
-                # apply the attributes to the runs found by the parser
-                for cascade, runs in parser.regions.items():
-                    style = attrs[cascade]
-                    for rng in runs:
-                        attrib_txt.setAttributes_range_(style, rng)
+                chunks = self._parse_xml(decoded, merged_style)
             else:
                 # don't parse as xml, just apply the current font(), align(), and fill()
                 attrs = self._fontify(merged_style)
-                attrib_txt = NSMutableAttributedString.alloc().initWithString_attributes_(decoded, attrs)
+                chunks = [NSMutableAttributedString.alloc().initWithString_attributes_(decoded, attrs)]
 
             # ensure the very-first character of a Text is indented flush left. also watch for
             # double-newlines at the edge of the existing string and the appended chars. grafs
             # can suppress their indentation with a \b (a.k.a. \x08) at the beginning of the
             # line and un-indented lead-grafs can force indentation by beginning with \t
-            pre_txt = self._store.string()
-            if not pre_txt or re.search(r'\n[\n\x08]$', pre_txt):
-                Text._dedent(attrib_txt)
-            elif pre_txt.endswith('\n'):
-                if re.match(r'\n[^\n]', attrib_txt.string()):
-                    Text._dedent(attrib_txt, 1)
-                elif re.match(r'\x08', attrib_txt.string()):
-                    Text._dedent(attrib_txt)
-
-            # ensure that any paragraph with more than one leading newline is indented flush-left
-            # (and let `\n\b` override auto-indentation)
-            for m in re.finditer(r'\n\x08|\n\n+[^\n]', attrib_txt.string()):
-                Text._dedent(attrib_txt, m.end()-1)
-
-        if attrib_txt:
+            start = self._store.length()
+            pre_txt = self._store.attributedSubstringFromRange_((max(0, start-2), min(start, 2))).string()
+
+            self._store.beginEditing()
+            try:
+                carry = u'' # trailing newlines from the previous chunk
+                for attrib_txt in chunks:
+                    offset = self._store.length()
+                    self._store.appendAttributedString_(attrib_txt)
+                    chunk_txt = attrib_txt.string()
+
+                    if offset == start and chunk_txt:
+                        if not pre_txt or re.search(r'\n[\n\x08]$', pre_txt):
+                            Text._dedent(self._store, offset)
+                        elif pre_txt.endswith('\n'):
+                            if re.match(r'\n[^\n]', chunk_txt):
+                                Text._dedent(self._store, offset+1)
+                            elif re.match(r'\x08', chunk_txt):
+                                Text._dedent(self._store, offset)
+
+                    # ensure that any paragraph with more than one leading newline is indented flush-left
+                    # (and let `\n\b` override auto-indentation)
+                    scan = carry + chunk_txt
+                    for m in re.finditer(r'\n\x08|\n\n+[^\n]', scan):
+                        Text._dedent(self._store, offset - len(carry) + m.end()-1)
+                    carry = re.search(r'\n*$', scan).group()
+            except:
+                # don't leave a partially-parsed document behind if the xml was malformed
+                self._store.deleteCharactersInRange_((start, self._store.length()-start))
+                raise
+            finally:
+                self._store.endEditing()
+
+            if self._store.length() > start:
+                self._resized()
+
+        elif attrib_txt:
             # let the typesetter deal with the new substring
             self._store.beginEditing()
             self._store.appendAttributedString_(attrib_txt)
             self._store.endEditing()
             self._resized()
 
+    def _parse_xml(self, decoded, merged_style):
+        """Stream an xml string through the parser, yielding attributed strings as they're completed"""
+
+        # find any tagged regions that need styling
+        parser = XMLParser(offset=self._store.length())
+        attrs = {}
+        for body, runs in parser.stream(decoded):
+            # start building the display-string (with all the tags now removed)
+            attrib_txt = NSMutableAttributedString.alloc().initWithString_(body)
+
+            # apply the attributes to the runs found by the parser (generating the proper `ns'
+            # font attrs for each unique cascade of xml tags as they're encountered)
+            for cascade, start, length in runs:
+                if cascade not in attrs:
+                    attrs[cascade] = self._fontify(merged_style, *cascade)
+                attrib_txt.setAttributes_range_(attrs[cascade], (start, length))
+            yield attrib_txt
+
+        # update our internal lookup table of nodes
+        for tag, elts in parser.nodes.items():
+            old_elts = self._nodes.get(tag, [])
+            self._nodes[tag] = old_elts + elts
+
     ### NSAttributedString de/manglers ###
 
     def _fontify(self, defaults, *styles):
@@ -204,7 +278,7 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
 
         # layer the styles to generate a final font and color
         for tag in styles:
-            spec.update(self.stylesheet._styles.get(tag,{}))
+            spec.update(self._stylesheet._styles.get(tag,{}))
 
         # assign a font and color based on the coalesced spec
         font = Font({k:v for k,v in spec.items() if k in Stylesheet.kwargs})
@@ -275,27 +349,34 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
 
     def overleaf(self):
         """Returns a Text object containing any characters that did not fit within this object's bounds.
-        If the entire string fits within the current object, returns None."""
-        seen = u"".join(getattr(f, 'text') for f in self._blocks)
-        full = self.text
-        if full not in seen:
-            next_pg = self.copy()
-
-            # delete the first page's-worth of chars and update indices
-            nc = len(seen)
-            next_pg._store.beginEditing()
-            next_pg._store.deleteCharactersInRange_([0, nc])
-            next_pg._store.endEditing()
-            nodes = {}
-            for tag, elts in self._nodes.items():
-                nodes[tag] = [e._replace(start=e.start-nc, end=e.end-nc) for e in elts if e.end-nc > 0]
-            next_pg._nodes = nodes
+        If the entire string fits within the current object, returns None.
 
-            # if the page-break is in the middle of a paragraph, preserve the first character's initial
-            # indentation (since otherwise it'll be treated as a `first' line of a new paragraph)
-            if not seen.endswith('\n'):
-                Text._dedent(next_pg._store, inherit=True)
-            return next_pg
+        Rather than copying the remaining characters, the new object is a `page' that shares this
+        one's text storage and layout manager. Its blocks are inserted into the layout sequence
+        directly after this object's final block, so calling overleaf() repeatedly lays out the
+        string in a single pass (and changes to a page's dimensions will reflow the pages after it).
+        Calling it more than once on the same object returns the same page. Once a page is no longer
+        in use, its blocks are removed from the shared layout.
+
+        Pages can't be appended to, but their copies are standalone Text objects containing the
+        characters from the page-break onward.
+        """
+        if sum(self._blocks[-1]._chars) < self._store.length():
+            # only add a new page if the previous one is no longer next in the layout sequence
+            # (e.g., because flow() has since replaced our blocks)
+            page = self._overleaf() if self._overleaf else None
+            if page is None or not page._follows(self):
+                page = Text(self, overleaf=True)
+                self._overleaf = weakref.ref(page, partial(_release, self._engine, page._held))
+                _pages.add(self._overleaf)
+            return page
+
+    def _follows(self, other):
+        """Whether our first block comes directly after the other Text's final block"""
+        containers = list(self._engine.textContainers())
+        last = other._blocks[-1]._block
+        idx = next((i for i, c in enumerate(containers) if c is last), None)
+        return idx is not None and containers[idx+1:idx+2] == [self._blocks[0]._block]
 
     def flow(self, columns=all, layout=None):
         """Add as many text blocks as necessary to fully lay out the string
@@ -331,6 +412,8 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
         while len(self._blocks) < count and sum(block._glyphs) < self._engine.numberOfGlyphs():
             block = TextBlock(block)
             self._blocks.append(block)
+            if self._shared:
+                self._held.append(block._block) # so it can be removed once the page is discarded
             yield block
 
     ### Layout geometry ###
@@ -380,7 +463,7 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
         return match
 
     def __len__(self):
-        return len(self.text)
+        return self._store.length() - self._origin
 
     def find(self, regex, matches=0):
         """Find all matching portions of the text string using regular expressions
@@ -441,13 +524,24 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
         """
         if isinstance(tag_name, str):
             tag_name = tag_name.decode('utf-8')
-        return self._seek(self._nodes.get(tag_name, []), matches)
+        nodes = self._nodes.get(tag_name, [])
+
+        # node indices are relative to the (possibly shared) storage so use the index to skip
+        # past the nodes on previous pages, then shift the rest to line up with this one's text
+        origin = self._origin
+        if origin:
+            index = self._node_index.get(tag_name)
+            if not index or index.elts is not nodes:
+                index = self._node_index[tag_name] = Intervals(nodes)
+            nodes = [e._replace(start=e.start-origin, end=e.end-origin) for e in index.overlapping(origin)]
+        return self._seek(nodes, matches)
 
     def _seek(self, stream, limit):
         found = []
+        spans = self._spans # measure the blocks once rather than for every match
         for m in stream:
             match = TextFragment(self, m)
-            if not match.blocks and limit is not all:
+            if not match._blocks_in(spans) and limit is not all:
                 break
             found.append(match)
             if len(found) == limit:
@@ -457,17 +551,28 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
     @property
     def text(self):
         """Returns the unicode string being typeset"""
-        return unicode(self._store.string())
+        # reuse the previous snapshot of the string unless it's grown (or been reflowed)
+        length, origin, txt = self._snapshot
+        if (length, origin) != (self._store.length(), self._origin):
+            length, origin = self._store.length(), self._origin
+            if origin:
+                txt = unicode(self._store.string().substringFromIndex_(origin))
+            else:
+                txt = unicode(self._store.string())
+            self._snapshot = (length, origin, txt)
+        return txt
 
     @property
     def words(self):
         """Returns a TextFragment for each word in the text string (whitespace separated)"""
-        return [TextFragment(self, w) for w in self._store.words()]
+        origin = self._origin
+        return [TextFragment(self, w) for w in self._store.words() if sum(w.range()) > origin]
 
     @property
     def paragraphs(self):
         """Returns a TextFragment for each `line' in the text string (newline separated)"""
-        return [TextFragment(self, w) for w in self._store.paragraphs()]
+        origin = self._origin
+        return [TextFragment(self, w) for w in self._store.paragraphs() if sum(w.range()) > origin]
 
     @property
     def blocks(self):
@@ -479,6 +584,33 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
         """Returns a list of TextFragments, one for each line across all child TextBlocks"""
         return [TextFragment(self, slug) for slug in foundry.line_slugs(self)]
 
+    ### Locating this object's blocks in a shared layout ###
+
+    @property
+    def _origin(self):
+        """The index within the text storage of the first character on this `page' (which is
+        always zero unless the object was created by overleaf() and shares its storage)"""
+        if not self._shared:
+            return 0
+        return self._blocks[0]._chars.location
+
+    @property
+    def _spans(self):
+        """An Intervals index of the (start, end) character ranges laid out in each of our blocks"""
+        origin = self._origin
+        spans = []
+        for block in self._blocks:
+            loc, n = block._chars
+            spans.append(Span(loc-origin, loc-origin+n, block))
+        return Intervals(spans)
+
+    @property
+    def _containers(self):
+        """A dict mapping indices in the layout manager's list of containers to our TextBlocks
+        (omitting any containers that belong to other pages in the layout sequence)"""
+        first = self._engine.textContainers().indexOfObject_(self._blocks[0]._block)
+        return {first+i:block for i, block in enumerate(self._blocks)}
+
     ### Calculating dimensions & rendering ###
 
     def _resized(self):
@@ -514,9 +646,10 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
     @property
     def _headroom(self):
         """Returns the distance between the Text's origin and the top of its bounds box"""
-        if not self._store.length():
+        if not len(self):
             return 0
-        return self._blocks[0]._from_px(self._engine.locationForGlyphAtIndex_(0).y)
+        glyph = self._blocks[0]._glyphs.location if self._shared else 0
+        return self._blocks[0]._from_px(self._engine.locationForGlyphAtIndex_(glyph).y)
 
     @property
     def _flipped_transform(self):
@@ -550,17 +683,17 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
 
             xf.translate(x, y-baseline) # set the position before applying transforms
             xf.prepend(nudge)           # nudge the block to its center
-            xf.prepend(self.transform)  # add context's CTM.
+            xf.prepend(self._transform) # add context's CTM.
             xf.prepend(nudge.inverse)   # Move back to the real origin.
         else:
-            xf.prepend(self.transform)  # in CORNER mode simply apply the CTM
+            xf.prepend(self._transform) # in CORNER mode simply apply the CTM
             xf.translate(x, y-baseline) # then move to the baseline origin point
         return xf
 
     def _draw(self):
         with _ns_context():                  # save and restore the gstate
             self._screen_transform.concat()  # transform so text can be drawn at the origin
-            with self.effects.applied():     # apply any blend/alpha/shadow effects
+            with self._effects.applied():    # apply any blend/alpha/shadow effects
                 for block in self._blocks:
                     px_offset = self._to_px(block.offset)
                     self._engine.drawGlyphsForGlyphRange_atPoint_(block._glyphs, px_offset)
@@ -585,6 +718,40 @@ class Text(EffectsMixin, TransformMixin, FrameMixin, StyleMixin, Grob):
         return self._flipped_transform.apply(path)
 
 
+_pages = set() # weakrefs to the live pages (keeping their callbacks around even once superseded)
+
+def _release(engine, containers, ref):
+    """Remove a discarded page's text containers from the layout it shared (see Text.overleaf)"""
+    _pages.discard(ref)
+    for container in containers:
+        current = list(engine.textContainers())
+        if container in current:
+            engine.removeTextContainerAtIndex_(current.index(container))
+
+Span = namedtuple('Span', ['start', 'end', 'block'])
+
+class Intervals(object):
+    """An index of (start, end) character ranges supporting fast overlap queries.
+
+    The ranges (either Elements or Spans) must be sorted by their start index. Lookups bisect the
+    starts to find the end of the candidate set and a running maximum of the ends to skip past
+    ranges that close before the query begins (a flattened, augmented interval tree).
+    """
+    def __init__(self, elts):
+        self.elts = elts
+        self.starts = [e.start for e in elts]
+        self.reach = []
+        reach = None
+        for e in elts:
+            reach = e.end if reach is None else max(reach, e.end)
+            self.reach.append(reach)
+
+    def overlapping(self, start, end=None):
+        """Returns the ranges (in order) that extend past `start' and begin before `end'"""
+        lo = bisect_right(self.reach, start)
+        hi = len(self.elts) if end is None else bisect_left(self.starts, end)
+        return [e for e in self.elts[lo:hi] if e.end > start]
+
 class TextFragment(object):
     """Represents a substring region within a Text object (via its `find` or `select` method)
 
@@ -617,13 +784,15 @@ class TextFragment(object):
             self.start, self.end = match.span
             self._slugs = [match]
         elif hasattr(match, 'range'): # NSSubText
-            self.start, n = match.range()
-            self.end = self.start + n
+            start, n = match.range()
+            origin = parent._origin
+            self.start, self.end = max(0, start-origin), start+n-origin
         elif hasattr(match, '_asdict'): # xml Element
             for k,v in match._asdict().items():
                 setattr(self, k, v)
         elif hasattr(match, '_chars'): # TextBlock
             self.start, n = match._chars
+            self.start -= parent._origin
             self.end = self.start + n
         elif hasattr(match, 'span'): # re.Match
             self.start, self.end = match.span()
@@ -722,8 +891,17 @@ class TextFragment(object):
     @property
     def blocks(self):
         """The list of TextBlock objects that the match spans"""
-        rng = (self.start, self.end-self.start)
-        return foundry.text_blocks(self._parent, rng)
+        # not cached since flow(), resizing, or adding pages can move the match to other blocks
+        return self._blocks_in(self._parent._spans)
+
+    def _blocks_in(self, spans):
+        # expand zero-width ranges to 1 char before looking them up
+        start, end = self.start, self.end
+        if start == end:
+            if start == len(self._parent)-1:
+                start -= 1
+            end = start+1
+        return [s.block for s in spans.overlapping(start, end) if s.start < s.end]
 
     @property
     def frame(self):
@@ -793,25 +971,32 @@ class TextBlock(FrameMixin, Grob):
         `lines` - a list of LineFragments contained in the block
         `path` - a Bezier object with all the visible glyphs in the block
     """
-    def __init__(self, parent):
+    def __init__(self, parent, container=None):
         # inherit the canvas-unit methods and a _frame
         self._frame = Region((0,0), (None,None))
         self.inherit()
 
+        if container is not None:
+            # wrap an existing container when copying a Text that shares its layout
+            self._block = container
+            self._parent = parent
+            return
+
         # create a new container
         self._block = NSTextContainer.alloc().init()
         self._block.setLineFragmentPadding_(0)
 
         if isinstance(parent, TextBlock):
-            # either piggyback on an existing block...
+            # either piggyback on an existing block (and follow it in the layout flow)...
             self._parent = parent._parent
             self.offset, self.size = parent.offset, parent.size
+            engine = self._parent._engine
+            idx = engine.textContainers().indexOfObject_(parent._block) + 1
+            engine.insertTextContainer_atIndex_(self._block, idx)
         else:
             # ... or become the first block of a parent Text object
             self._parent = parent
-
-        # add ourselves to the layout flow
-        self._parent._engine.addTextContainer_(self._block)
+            self._parent._engine.addTextContainer_(self._block)
 
     @trim_zeroes
     def __repr__(self):
@@ -820,7 +1005,7 @@ class TextBlock(FrameMixin, Grob):
     @property
     def idx(self):
         """An integer marking this block's place in the flow sequence"""
-        return self._parent._engine.textContainers().index(self._block)
+        return self._parent._blocks.index(self)
 
     @property
     def text(self):
@@ -852,7 +1037,8 @@ class TextBlock(FrameMixin, Grob):
     @property
     def lines(self):
         """A list of TextFragments describing the line-layout within the block"""
-        slugs = foundry.line_slugs(self._parent, self._chars)
+        start, n = self._chars
+        slugs = foundry.line_slugs(self._parent, (start-self._parent._origin, n))
         return [TextFragment(self._parent, slug) for slug in slugs]
 
     @property
@@ -862,7 +1048,7 @@ class TextBlock(FrameMixin, Grob):
 
     @property
     def _headroom(self):
-        if not self._parent.text:
+        if not len(self._parent):
             return self._parent._font.ascender
         fnt, _ = self._parent._store.attribute_atIndex_effectiveRange_("NSFont", self._chars.location, None);
         if not fnt:
@@ -897,9 +1083,10 @@ class TextBlock(FrameMixin, Grob):
 
     @property
     def _alignment(self):
-        if not self._parent._store.string():
+        if not len(self._parent):
             return LEFT
-        graf, _ = self._parent._store.attribute_atIndex_effectiveRange_("NSParagraphStyle", 0, None)
+        idx = self._parent._origin
+        graf, _ = self._parent._store.attribute_atIndex_effectiveRange_("NSParagraphStyle", idx, None)
         return {_TEXT[a]:a for a in _TEXT}.get(graf.alignment(), LEFT)
 
     @property
@@ -19,9 +19,10 @@ __all__ = ("Family", "Font", "Stylesheet", )
 class Font(object):
     def __init__(self, *args, **kwargs):
 
-        # handle the bootstrap case where we're initializing the ctx's font
+        # handle the bootstrap case where we're initializing the ctx's font (its
+        # face is looked up on first use to avoid enumerating the system's fonts)
         if args==(None,):
-            self._face = font_face("HelveticaNeue")
+            self._face = "HelveticaNeue"
             self._metrics = dict(size=24.0, leading=1.2, tracking=0,
                                  indent=0, margin=(0,0), spacing=(0,0),
                                  hyphenate=0, align="left")
@@ -61,6 +62,14 @@ class Font(object):
         self._metrics = line_metrics(spec)
         self._features = aat_features(spec)
 
+    def _get_face(self):
+        if isinstance(self.__face, basestring):
+            self.__face = font_face(self.__face)
+        return self.__face
+    def _set_face(self, face):
+        self.__face = face
+    _face = property(_get_face, _set_face)
+
     def __repr__(self):
         spec = [self.family, self.weight]
         if self._face.variant:
@@ -150,6 +150,8 @@ class ScriptController(NSWindowController):
     def _init_state(self):
         self.vm = Sandbox(self)
         self.animationTimer = None
+        self.echoTimer = None
+        self._echoes = [] # (isErr, txt) tuples waiting to be appended to the outputView
         self.fullScreen = None
         self.currentView = None
         self.stationery = None
@@ -346,6 +348,7 @@ class ScriptController(NSWindowController):
         # get all the output progress indicators going
         self.statusView.beginRun()
         if (self.outputView):
+            self.flushOutput()
             self.editorView.clearErrors()
             self.outputView.clear(timestamp=True)
 
@@ -426,9 +429,33 @@ class ScriptController(NSWindowController):
         return result.ok
 
     def echo(self, output):
-        """Pass a list of (isStdErr, txt) tuples to the output window"""
-        for isErr, data in output:
-            self.outputView.append(data, stream='err' if isErr else 'message')
+        """Queue a list of (isStdErr, txt) tuples to be passed to the output window
+
+        Rather than updating the view after every call, output is batched and flushed a few
+        times per second (or when the run ends)."""
+        if not output:
+            return
+        self._echoes.extend(output)
+        if not self.echoTimer:
+            self.echoTimer = set_timeout(self, 'flushOutput', 0.1)
+
+    def flushOutput(self):
+        """Append any queued output to the output window (merging consecutive writes)"""
+        if self.echoTimer:
+            self.echoTimer.invalidate()
+            self.echoTimer = None
+        echoes, self._echoes = self._echoes, []
+        if not self.outputView:
+            return
+
+        merged = []
+        for isErr, data in echoes:
+            if merged and merged[-1][0] == isErr:
+                merged[-1][1].append(data)
+            else:
+                merged.append((isErr, [data]))
+        for isErr, chunks in merged:
+            self.outputView.append(u''.join(chunks), stream='err' if isErr else 'message')
 
     def _ui_state(self):
         """Collect mouse & keyboard events to be spliced into the script's namespace"""
@@ -485,6 +512,7 @@ class ScriptController(NSWindowController):
 
         # if we're exporting multiple frames, give some ui feedback
         if self.outputView:
+            self.flushOutput()
             self.outputView.clear(timestamp=True)
         if self.statusView:
             self.statusView.beginExport()
@@ -550,6 +578,7 @@ class ScriptController(NSWindowController):
             self.statusView.endRun()
 
         # relay any errors to the text panes (if we're in the app)
+        self.flushOutput()
         if self.editorView:
             self.editorView.report(self.vm.crashed, self.vm.path or "<Untitled>")
             self.outputView.report(self.vm.crashed, self.vm.namespace.get('FRAME') if self.vm.animated else None)
@@ -335,6 +335,7 @@ class OutputTextView(NSTextView):
     # editor = IBOutlet()
     endl = False
     scroll_lock = True
+    limit = 1000000 # max characters of output to retain
 
     def awakeFromNib(self):
         self.ts = self.textStorage()
@@ -414,6 +415,13 @@ class OutputTextView(NSTextView):
         atxt = NSAttributedString.alloc().initWithString_attributes_(txt, self._attrs(stream))
         self.ts.beginEditing()
         self.ts.appendAttributedString_(atxt)
+        overflow = self.ts.length() - self.limit
+        if overflow > 0:
+            # discard the oldest lines once the transcript gets too long
+            newline = self.ts.string().find(u"\n", overflow)
+            if newline >= 0:
+                overflow = newline + 1
+            self.ts.deleteCharactersInRange_((0, overflow))
         self.ts.endEditing()
         self.scrollRangeToVisible_(NSMakeRange(self.ts.length()-1, 0))
         self.endl = defer_endl
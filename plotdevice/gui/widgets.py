@@ -91,22 +91,18 @@ class DashboardController(NSObject):
             s.removeFromSuperview()
 
     def numberChanged_(self, sender):
-        var = self.script.vm.vars[sender.tag()]
-        var.value = sender.floatValue()
-        self.script.runScript()
+        self._tweak(sender, sender.floatValue())
 
     def textChanged_(self, sender):
-        var = self.script.vm.vars[sender.tag()]
-        var.value = sender.stringValue()
-        self.script.runScript()
+        self._tweak(sender, sender.stringValue())
 
     def booleanChanged_(self, sender):
-        var = self.script.vm.vars[sender.tag()]
-        if sender.state() == NSOnState:
-            var.value = True
-        else:
-            var.value = False
-        self.script.runScript()
+        self._tweak(sender, sender.state() == NSOnState)
+
+    def _tweak(self, sender, value):
+        # let the sandbox coalesce rapid-fire changes (e.g., slider drags) into a single run
+        vm = self.script.vm
+        vm.tweak(vm.vars[sender.tag()].name, value, self.script.runScript)
 
     def buttonClicked_(self, sender):
         print "out of service"
@@ -1,17 +1,18 @@
 # all the NSBits and NSPieces
 
-from Quartz import CALayer, CGColorCreate, CGContextAddPath, CGContextAddRect, CGContextBeginPath, \
-                   CGContextBeginTransparencyLayer, CGContextBeginTransparencyLayerWithRect, \
+from Quartz import CALayer, CGBitmapContextGetWidth, CGColorCreate, CGContextAddPath, CGContextAddRect, \
+                   CGContextBeginPath, CGContextBeginTransparencyLayer, CGContextBeginTransparencyLayerWithRect, \
                    CGContextClip, CGContextClipToMask, CGContextDrawPath, CGContextEOClip, \
-                   CGContextEndTransparencyLayer, CGContextRestoreGState, CGContextSaveGState, \
+                   CGContextEndTransparencyLayer, CGContextGetUserSpaceToDeviceSpaceTransform, \
+                   CGContextRestoreGState, CGContextSaveGState, \
                    CGContextSetAlpha, CGContextSetBlendMode, CGContextSetFillColorWithColor, \
                    CGContextSetLineCap, CGContextSetLineDash, CGContextSetLineJoin, CGContextSetLineWidth, \
                    CGContextSetStrokeColorWithColor, CGImageGetBitsPerComponent, CGImageGetBitsPerPixel, \
                    CGImageGetBytesPerRow, CGImageGetDataProvider, CGImageGetHeight, CGImageGetWidth, \
-                   CGImageMaskCreate, CGPathAddCurveToPoint, CGPathAddLineToPoint, CGPathCloseSubpath, \
-                   CGPathCreateCopy, CGPathCreateMutable, CGPathRelease, CGPathMoveToPoint, kCGBlendModeClear, \
-                   kCGBlendModeColor, kCGBlendModeColorBurn, kCGBlendModeColorDodge, kCGBlendModeCopy, \
-                   kCGBlendModeDarken, kCGBlendModeDestinationAtop, kCGBlendModeDestinationIn, \
+                   CGImageMaskCreate, CGPathAddCurveToPoint, CGPathAddLineToPoint, CGPathAddPath, CGPathAddRect, \
+                   CGPathCloseSubpath, CGPathCreateCopy, CGPathCreateMutable, CGPathRelease, CGPathMoveToPoint, \
+                   kCGBlendModeClear, kCGBlendModeColor, kCGBlendModeColorBurn, kCGBlendModeColorDodge, \
+                   kCGBlendModeCopy, kCGBlendModeDarken, kCGBlendModeDestinationAtop, kCGBlendModeDestinationIn, \
                    kCGBlendModeDestinationOut, kCGBlendModeDestinationOver, kCGBlendModeDifference, \
                    kCGBlendModeExclusion, kCGBlendModeHardLight, kCGBlendModeHue, kCGBlendModeLighten, \
                    kCGBlendModeLuminosity, kCGBlendModeMultiply, kCGBlendModeNormal, kCGBlendModeOverlay, \
@@ -20,14 +21,16 @@ from Quartz import CALayer, CGColorCreate, CGContextAddPath, CGContextAddRect, C
                    kCGBlendModeSourceOut, kCGBlendModeXOR, kCGLineCapButt, kCGLineCapRound, kCGLineCapSquare, \
                    kCGLineJoinBevel, kCGLineJoinMiter, kCGLineJoinRound, kCGPathFill, kCGPathFillStroke, \
                    kCGPathStroke, kCIInputImageKey
-from AppKit import NSAlert, NSApp, NSApplication, NSApplicationActivationPolicyAccessory, \
-                   NSBackingStoreBuffered, NSBeep, NSBezierPath, NSBitmapImageRep, NSBorderlessWindowMask, \
+from AppKit import NSAlert, NSAlphaNonpremultipliedBitmapFormat, NSApp, NSApplication, \
+                   NSApplicationActivationPolicyAccessory, NSBackingStoreBuffered, NSBeep, NSBezierPath, \
+                   NSBitmapImageRep, NSBorderlessWindowMask, \
                    NSButton, NSCenterTextAlignment, NSChangeAutosaved, NSChangeCleared, NSChangeDone, \
                    NSChangeReadOtherContents, NSChangeRedone, NSChangeUndone, NSClipView, \
                    NSClosePathBezierPathElement, NSColor, NSColorSpace, NSCompositeCopy, \
                    NSCompositeSourceOver, NSContentsCellMask, NSCriticalAlertStyle, NSCursor, \
-                   NSCurveToBezierPathElement, NSDeviceCMYKColorSpace, NSDeviceRGBColorSpace, NSDocument, \
-                   NSDocumentController, NSFindPboard, NSFixedPitchFontMask, NSFocusRingTypeExterior, \
+                   NSCurveToBezierPathElement, NSDeviceCMYKColorSpace, NSDeviceRGBColorSpace, \
+                   NSDeviceWhiteColorSpace, NSDocument, NSDocumentController, NSFindPboard, \
+                   NSFixedPitchFontMask, NSFocusRingTypeExterior, \
                    NSFont, NSFontDescriptor, NSFontManager, NSForegroundColorAttributeName, NSGIFFileType, \
                    NSGradient, NSGraphicsContext, NSGraphiteControlTint, NSImage, NSImageCacheNever, \
                    NSImageCompressionFactor, NSImageInterpolationHigh, NSItalicFontMask, NSJPEGFileType, \
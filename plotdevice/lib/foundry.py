@@ -270,7 +270,8 @@ aat_options = {
 def trace_text(txt_obj, rng=None):
     """Returns an NSBezierPath with the glyphs contained by a TextBlock object"""
     if rng is None:
-        rng = (0, len(txt_obj.text))
+        rng = (0, len(txt_obj))
+    rng = (rng[0] + txt_obj._origin, rng[1]) # shift to an index within the (shared) storage
 
     # assemble the glyphs in px units then transform them back to screen units
     # (since whatever Bezier it's appended to will handle screen->px conversion)
@@ -289,21 +290,31 @@ def line_slugs(txt_obj, rng=None):
     flatten = None # flag ranges with a zero-width
 
     if rng is None:
-        rng = (0, len(txt_obj.text))
+        rng = (0, len(txt_obj))
     elif rng[1]==0:
         # expand zero-width ranges to 1 char before measuring
         flatten = min;
         start = rng[0]
-        if start == len(txt_obj.text):
+        if start == len(txt_obj):
             # also allow zero-width slices of the len+1'th char
             start -= 1
             flatten = max
         rng = (start, 1)
 
+    # shift to an index within the (possibly shared) storage and clip the range to the
+    # chars laid out in the object's blocks (rather than those of subsequent pages)
+    origin = txt_obj._origin
+    start = rng[0] + origin
+    end = min(start + rng[1], max(sum(b._chars) for b in txt_obj._blocks))
+    rng = (start, max(end-start, 0))
+
     slugs = []
+    blocks = txt_obj._containers
     for frag in Vandercook.lineFragmentsInRange_withLayout_(rng, txt_obj._engine):
         # convert to local units & types
-        block = txt_obj._blocks[frag['block']]
+        block = blocks.get(frag['block'])
+        if block is None:
+            continue
         frame = block._from_px(frag['frame'].rectValue())
         bounds = block._from_px(frag['bounds'].rectValue())
         baseline = block._from_px(frag['baseline'].pointValue())
@@ -316,6 +327,7 @@ def line_slugs(txt_obj, rng=None):
 
         # calculate glyph range within the line fragment
         loc, count = frag['range'].rangeValue()
+        loc -= origin
         if flatten:
             # re-contract ranges that were expanded from zero
             if flatten is max:
@@ -331,14 +343,16 @@ def line_slugs(txt_obj, rng=None):
 
 def text_blocks(txt_obj, rng=None):
     if rng is None:
-        rng = (0, len(txt_obj.text))
+        rng = (0, len(txt_obj))
     elif rng[1]==0:
         start = rng[0]
-        if start == len(txt_obj.text)-1:
+        if start == len(txt_obj)-1:
             start -= 1
         rng = (start, 1)
+    rng = (rng[0] + txt_obj._origin, rng[1])
     containers = Vandercook.textContainersInRange_withLayout_(rng, txt_obj._engine)
-    return [txt_obj._blocks[i] for i in containers]
+    blocks = txt_obj._containers
+    return [blocks[i] for i in containers if i in blocks]
 
 def aat_attrs(spec):
     """Converts a validated features spec to a dict suitable for NSFontDescriptor"""
@@ -524,6 +538,9 @@ class Librarian(object):
     _mgr = NSLayoutManager.alloc().init()
 
     def __init__(self):
+        self._fonts = None # the font list is built on first use (see refresh)
+
+    def _load(self):
         self._fonts = _fm.availableFonts()
         self._fams = sorted(_fm.availableFontFamilies())
         self._members = {} # famname -> [Face(), Face(), ...]
@@ -534,8 +551,8 @@ class Librarian(object):
         self._mgr.setUsesFontLeading_(False)
 
     def refresh(self):
-        if self._fonts != _fm.availableFonts():
-            self.__init__()
+        if self._fonts is None or self._fonts != _fm.availableFonts():
+            self._load()
 
     @property
     def font_names(self):
@@ -650,6 +667,7 @@ class Librarian(object):
 
     def list_fam(self, famname, names=False):
         """Returns a sorted list of Face tuples for the fonts in a family"""
+        self.refresh()
 
         # use cached data if possible...
         if famname not in self._members:
@@ -94,6 +94,7 @@ class ImageExportSession(ExportSession):
             if pad:
                 fname = re_padded.sub(pad%0, fname, count=1)
             self.writer = Pages.alloc().initWithFile_(fname)
+            self.pattern = None
         else:
             # output multiple, sequentially-named files
             if pad:
@@ -102,6 +103,15 @@ class ImageExportSession(ExportSession):
                 basename, ext = os.path.splitext(fname)
                 name_tmpl = "".join([basename, '-%04d', ext])
             self.writer = Pages.alloc().initWithPattern_(name_tmpl)
+            self.pattern = name_tmpl
+        self.fname = fname
+
+    @property
+    def files(self):
+        """The paths of the files written by the session so far"""
+        if self.pattern:
+            return [self.pattern % (i+1) for i in range(self.added)]
+        return [self.fname] if self.added else []
 
     def add(self, canvas):
         image = canvas._getImageData(self.format)
@@ -139,3 +149,8 @@ class MovieExportSession(ExportSession):
         self.writer.addFrame_(image)
         self.added += 1
 
+    @property
+    def files(self):
+        """The paths of the files written by the session so far"""
+        return [self.fname] if self.added else []
+
@@ -29,4 +29,7 @@ from .common import encoded
 # expose the script-runner object
 from .sandbox import Sandbox
 
-__all__ = ('objc', 'encoding', 'Sandbox')
\ No newline at end of file
+# and the headless var() explorer
+from .sweep import sweep
+
+__all__ = ('objc', 'encoding', 'Sandbox', 'sweep')
\ No newline at end of file
@@ -1,14 +1,17 @@
 import os, sys, re
-from os.path import dirname, basename, abspath, relpath, isdir
+import imp, marshal, tempfile
+from os.path import dirname, basename, abspath, relpath, isdir, exists, join
 from functools import partial
 from inspect import getargspec
-from collections import namedtuple
+from hashlib import sha1
+from collections import namedtuple, OrderedDict, deque
 from PyObjCTools import AppHelper
 from Foundation import *
 from AppKit import *
 from ..lib.io import MovieExportSession, ImageExportSession
 from .common import stacktrace, coredump, uncoded
 from plotdevice import util, context, gfx, Halted, DeviceError
+from ..util.readers import cache_dir
 
 __all__ = ['Sandbox']
 
@@ -37,6 +40,7 @@ class Delegate(object):
         pass
 
 class Sandbox(object):
+    _boxed = None # (sandbox, env, saved-env) for the script whose environment is in place
 
     def __init__(self, delegate=None):
         self._meta = None       # runtime opts for the script
@@ -51,6 +55,10 @@ class Sandbox(object):
         self.live = False       # whether to keep the output pipe open between runs
         self.session = None     # the image/movie export session (if any)
         self.delegate = None    # object with exportFrame and exportProgress methods
+        self.debounce = 0.15    # seconds to wait for var() changes to settle before re-running
+        self._tweaks = OrderedDict() # var name -> latest value (pending a re-run)
+        self._tweaked = 0       # incremented with each tweak (so stale re-runs can be skipped)
+        self._later = AppHelper.callLater
 
 
         # set up the graphics plumbing
@@ -118,9 +126,48 @@ class Sandbox(object):
         """Whether the script's output is being redirected to a pipe (r)"""
         return getattr(self.delegate, 'graphicsView', None) is None
 
+    def tweak(self, name, value, rerun):
+        """Change a var() value and re-run the script once the changes settle down
+
+        Changes made within `debounce` seconds of one another are coalesced into a single
+        call to `rerun` (typically the ScriptController's runScript method) using the latest
+        value for each var. If the script is run in the meantime for some other reason, the
+        pending values are applied to that run instead and the re-run is skipped.
+        """
+        self._tweaks[name] = value
+        self._tweaked += 1
+        self._later(self.debounce, self._settle, self._tweaked, rerun)
+
+    def _settle(self, tweaked, rerun):
+        # only the most recent tweak's timer triggers a run (and only if it's still needed)
+        if tweaked == self._tweaked and self._tweaks:
+            rerun()
+
+    def _apply_tweaks(self):
+        for var in self.vars:
+            if var.name in self._tweaks:
+                var.value = self._tweaks[var.name]
+        self._tweaks.clear()
+
+    def discard_pending(self):
+        """Discard any var() changes that haven't been rendered yet
+
+        Only re-runs that are still waiting for their debounce timer are dropped. Scripts run
+        synchronously on the main thread, so a run that's already underway can't be interrupted
+        and will finish before any later tweak is handled.
+        """
+        self._tweaks.clear()
+        self._tweaked += 1
+
     def _preflight(self):
         """Set up a namespace for the script and prepare it for rendering"""
 
+        # use the latest values from the dashboard
+        self._apply_tweaks()
+
+        # tear down the environment left over from a previous animation (if any)
+        self._unbox()
+
         # Initialize the namespace
         self.context._resetEnvironment()
 
@@ -141,7 +188,7 @@ class Sandbox(object):
                 src = uncoded(self._source)
                 scriptname = self._path or "<Untitled>"
                 fname = scriptname.encode('ascii', 'ignore')
-                self._code = compile(src, fname, "exec")
+                self._code = BYTECODE.compile(src, fname)
             result = self.call(compileScript)
             if not result.ok:
                 return result
@@ -231,37 +278,65 @@ class Sandbox(object):
             scriptName = self._path
             scriptDir = dirname(scriptName)
 
-        # save the external runtime environment
-        pipes = sys.stdout, sys.stderr
-        cwd = os.getcwd()
-        argv = sys.argv
-        syspath = list(sys.path)
-        sys.argv = [scriptName] + self._meta.args
+        # point cwd, sys.path, and sys.argv at the script (unless they already are)
+        self._box(scriptName, scriptDir)
 
-        # set up environment for script
+        # capture the output of this call alone
+        pipes = sys.stdout, sys.stderr
         output = StdIO()
         sys.stdout, sys.stderr = output.pipes
-        if self._meta.virtualenv:
-            sys.path.insert(0, self._meta.virtualenv)
-        sys.path.insert(0, scriptDir)
-        os.chdir(scriptDir)
 
         try:
             # run the code object we were passed
             method()
+            result = Outcome(True, output.data)
         except Halted:
-            return Outcome('HALTED', output.data)
+            result = Outcome('HALTED', output.data)
         except:
             # print the stacktrace and quit
             sys.stderr.write(self.die())
-            return Outcome(False, output.data)
+            result = Outcome(False, output.data)
         finally:
-            # restore the environment
             sys.stdout, sys.stderr = pipes
+
+        # leave the environment in place between the frames of an ongoing animation
+        if self._anim is None or result.ok in (False, 'HALTED'):
+            self._unbox()
+        return result
+
+    def _box(self, scriptName, scriptDir):
+        """Set up the script's runtime environment (saving the external one for _unbox)
+
+        The environment is left in place after the call returns so consecutive animation
+        frames can skip this step. If a different script (or the same one with a different
+        path or args) is boxed, its environment is torn down first.
+        """
+        env = (scriptName, scriptDir, list(self._meta.args), self._meta.virtualenv)
+        if Sandbox._boxed:
+            owner, boxed_env, _ = Sandbox._boxed
+            if owner is self and boxed_env == env:
+                return
+            owner._unbox()
+
+        # save the external runtime environment
+        saved = os.getcwd(), sys.argv, list(sys.path)
+
+        # set up environment for script
+        sys.argv = [scriptName] + self._meta.args
+        if self._meta.virtualenv:
+            sys.path.insert(0, self._meta.virtualenv)
+        sys.path.insert(0, scriptDir)
+        os.chdir(scriptDir)
+        Sandbox._boxed = (self, env, saved)
+
+    def _unbox(self):
+        """Restore the environment that was in place before _box (if we're the current owner)"""
+        if Sandbox._boxed and Sandbox._boxed[0] is self:
+            cwd, argv, syspath = Sandbox._boxed[2]
+            Sandbox._boxed = None
             os.chdir(cwd)
             sys.path = syspath
             sys.argv = argv
-        return Outcome(True, output.data)
 
     def stop(self):
         """Called when an animated run is halted (voluntarily or otherwise)"""
@@ -269,6 +344,7 @@ class Sandbox(object):
         result = Outcome(True, [])
         if not self.crashed:
             result = self.call("stop")
+        self._unbox()
         return result
 
     def die(self):
@@ -345,6 +421,7 @@ class Sandbox(object):
         else:
             # we've drawn the final frame in the export
             result = self.call("stop")
+            self._unbox()
             self.delegate.exportFrame(result, canvas=None)
             self.session.done()
 
@@ -353,8 +430,78 @@ class Sandbox(object):
 
     def _cleanup(self):
         # self.session = None
+        self.discard_pending()
+        self._unbox()
         self.delegate = None
 
+class CodeCache(object):
+    """Compiles scripts and caches the resulting code objects in memory and on disk
+
+    Entries are keyed by a hash of the source, the filename it was compiled under, and the
+    interpreter version, so unchanged scripts (even across separate console runs) skip the
+    compile step. The `size` most recently used code objects are kept in memory and, if
+    `cachedir` is set, every compiled script is marshaled to a file in that directory.
+    """
+    size = 32
+
+    def __init__(self, cachedir=None):
+        self.cachedir = cachedir
+        self._code = OrderedDict() # key -> code object (in least- to most-recently used order)
+
+    def key(self, src, fname):
+        digest = sha1()
+        for part in (imp.get_magic(), sys.version, fname, src.encode('utf-8')):
+            digest.update(part)
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def compile(self, src, fname):
+        """Returns a code object for the source (raising SyntaxError if it doesn't compile)"""
+        key = self.key(src, fname)
+        code = self._code.pop(key, None) or self._load(key)
+        if code is None:
+            code = compile(src, fname, "exec")
+            self._save(key, code)
+
+        self._code[key] = code
+        while len(self._code) > self.size:
+            self._code.popitem(last=False)
+        return code
+
+    def clear(self):
+        self._code.clear()
+
+    def _path(self, key):
+        return join(os.path.expanduser(self.cachedir), '%s.marshal' % key)
+
+    def _load(self, key):
+        if not self.cachedir:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                return marshal.load(f)
+        except (IOError, EOFError, ValueError, TypeError):
+            return None # a missing or truncated entry
+
+    def _save(self, key, code):
+        if not self.cachedir:
+            return
+        pth, tmp = self._path(key), None
+        try:
+            if not exists(dirname(pth)):
+                os.makedirs(dirname(pth))
+            fd, tmp = tempfile.mkstemp(dir=dirname(pth))
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump(code, f)
+            os.rename(tmp, pth) # so concurrent runs never see a partial file
+        except (IOError, OSError):
+            pass
+        finally:
+            if tmp and exists(tmp):
+                os.unlink(tmp)
+
+BYTECODE = CodeCache(cachedir=join(cache_dir, 'bytecode'))
+
 PY2 = sys.version_info[0] == 2
 if not PY2:
     char_type = bytes
@@ -362,6 +509,14 @@ else:
     char_type = str
 
 class StdIO(object):
+    """Collects the console output of a single call
+
+    Consecutive writes to the same stream are merged into a single (isErr, txt) entry so
+    scripts that print in tight loops don't generate a separate ui update for every line.
+    At most `limit` characters are retained; beyond that the oldest output is dropped.
+    """
+    limit = 1000000
+
     class OutputFile(object):
         def __init__(self, stream, streamname):
             self.stream = stream
@@ -376,11 +531,35 @@ class StdIO(object):
             self.stream.write(Output(self.isErr, data))
 
     def __init__(self):
-        self.data = [] # the list of (isErr, txt) tuples .write calls go to
+        self._runs = deque() # (isErr, deque([txt, ...])) for each run of writes to a stream
+        self._size = 0       # characters currently retained
+        self._dropped = 0    # characters discarded to stay within the limit
 
     @property
     def pipes(self):
         return self.OutputFile(self, 'stdout'), self.OutputFile(self, 'stderr')
 
+    @property
+    def data(self):
+        """The list of (isErr, txt) tuples the .write calls went to"""
+        output = [Output(isErr, u''.join(chunks)) for isErr, chunks in self._runs]
+        if self._dropped:
+            omitted = u'[%i characters of earlier output omitted]\n' % self._dropped
+            output.insert(0, Output(True, omitted))
+        return output
+
     def write(self, output):
-        self.data.append(output)
+        if self._runs and self._runs[-1][0] == output.isErr:
+            self._runs[-1][1].append(output.data)
+        else:
+            self._runs.append((output.isErr, deque([output.data])))
+        self._size += len(output.data)
+
+        # discard the oldest chunks (but never the most recent one) once over the limit
+        while self._size > self.limit and (len(self._runs) > 1 or len(self._runs[0][1]) > 1):
+            chunks = self._runs[0][1]
+            txt = chunks.popleft()
+            self._size -= len(txt)
+            self._dropped += len(txt)
+            if not chunks:
+                self._runs.popleft()
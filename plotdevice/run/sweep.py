@@ -0,0 +1,327 @@
+# encoding: utf-8
+"""
+sweep.py
+
+Renders a script once for every combination of values of its var() parameters.
+
+The sweep() function (and the `plotdevice script.pv --export out.png --sweep ...` command line
+switch) expands a set of ranges into a grid of variants and distributes them among a pool of
+worker processes. Each variant is written to its own numbered file alongside an index of the
+values it was rendered with and a contact sheet showing them all side by side. Animated scripts
+are rendered as a still image of their first frame.
+
+When run as a script, this module acts as either the coordinator of a command-line sweep or one
+of its workers. Like console.py, it expects its parameters to be passed as a json blob piped to
+stdin. Workers then read one json job per line and reply with a line of json describing the result.
+"""
+
+import os
+import sys
+import json
+import select
+from math import ceil, sqrt
+from itertools import product
+from collections import OrderedDict
+from multiprocessing import cpu_count
+from subprocess import Popen, PIPE
+from os.path import abspath, dirname, splitext
+
+__all__ = ('sweep', 'steps')
+
+SWEEP_FORMATS = ('pdf', 'eps', 'png', 'tiff', 'jpg', 'gif')
+
+def steps(spec):
+    """Expands a range specification into a list of values
+
+    Specs can be strings of the form "lo:hi:n" (n evenly spaced numbers from lo to hi inclusive)
+    or "a,b,c" (a list of values), numbers (a single value), or any other iterable of values.
+    """
+    if isinstance(spec, basestring):
+        if ':' in spec:
+            try:
+                lo, hi, n = spec.split(':')
+                lo, hi, n = float(lo), float(hi), int(n)
+            except ValueError:
+                from plotdevice import DeviceError
+                badspec = 'Sweep ranges should be of the form "lo:hi:n" (not "%s")' % spec
+                raise DeviceError(badspec)
+            if n < 2:
+                return [lo]
+            return [lo + (hi-lo) * i / (n-1) for i in range(n)]
+        return [s.strip() for s in spec.split(',')]
+    elif isinstance(spec, (int, long, float)):
+        return [spec]
+    return list(spec)
+
+def variants(ranges):
+    """Returns an OrderedDict of var values for every combination in a set of ranges
+
+    The ranges can be a dict (or list of pairs) mapping var names to specs (see steps) or a
+    list of "name=spec" strings.
+    """
+    if hasattr(ranges, 'items'):
+        ranges = ranges.items()
+    pairs = []
+    for r in ranges:
+        if isinstance(r, basestring):
+            if '=' not in r:
+                from plotdevice import DeviceError
+                badrange = 'Sweep ranges should be of the form "name=values" (not "%s")' % r
+                raise DeviceError(badrange)
+            r = r.split('=', 1)
+        name, spec = r
+        pairs.append((name.strip(), steps(spec)))
+
+    names = [name for name, vals in pairs]
+    return [OrderedDict(zip(names, combo)) for combo in product(*[vals for name, vals in pairs])]
+
+def sweep(path, ranges, dest, workers=None, seed=0, sheet=True, cols=None, args=(), progress=None):
+    """Render a script once for every combination of values in `ranges`
+
+    Arguments:
+      - `path` is the script to be rendered
+      - `ranges` maps the names of the script's var()s to the values they should take (see
+        steps() for the supported formats). Vars not listed keep their default value and names
+        the script never declares with var() raise a DeviceError.
+      - `dest` is a filename ending in pdf, eps, png, tiff, jpg, or gif. Variants are written to
+        numbered files based on it (e.g., out.png becomes out-0001.png, out-0002.png, ...).
+
+    Keyword Args:
+      - `workers` sets the number of processes to render with (defaulting to one per core)
+      - `seed` is passed to random.seed() before each render so variants only differ in the
+        values of their vars
+      - `sheet` controls whether a contact sheet (e.g., out-sheet.png) is also created and
+        `cols` sets the number of variants in each of its rows
+      - `args` is a list of values to be passed to the script as sys.argv
+      - `progress` is an optional function that will be called with (done, total, variant) as
+        each render finishes
+
+    Returns a list of dicts (one per variant) with the keys `index`, `file`, `values`, `ok`,
+    and `output`. A summary is also written to an index file (e.g., out-index.json).
+
+    If the script is an animation, only its first frame is rendered (after calling setup() and
+    a single draw()) and a note saying so is added to each variant's output.
+    """
+    path, dest = abspath(path), abspath(dest)
+    base, ext = splitext(dest)
+    if ext[1:].lower() not in SWEEP_FORMATS:
+        from plotdevice import DeviceError
+        badformat = 'Sweeps can only be exported to: %s' % ', '.join(SWEEP_FORMATS)
+        raise DeviceError(badformat)
+
+    combos = variants(ranges)
+    jobs = [dict(file=path, values=vals, seed=seed, args=list(args), dest='%s-%04i%s' % (base, i+1, ext))
+            for i, vals in enumerate(combos)]
+
+    def variant(i, result):
+        return dict(index=i+1, file=jobs[i]['dest'] if result['ok'] else None,
+                    values=jobs[i]['values'], ok=result['ok'], output=result['output'])
+
+    def finished(done, i, result):
+        if progress:
+            progress(done, len(jobs), variant(i, result))
+
+    pool = Pool(min(workers or cpu_count(), len(jobs)))
+    try:
+        # render the first variant on its own to make sure the script declares every swept var
+        probe = pool.map(jobs[:1])
+        for result in probe:
+            if result.get('unknown'):
+                from plotdevice import DeviceError
+                badvar = 'Not a var() in %s: %s' % (path, ', '.join(result['unknown']))
+                raise DeviceError(badvar)
+            finished(1, 0, result)
+
+        rest = pool.map(jobs[1:], lambda done, i, result: finished(done+1, i+1, result))
+        swept = [variant(i, result) for i, result in enumerate(probe + rest)]
+
+        with open('%s-index.json' % base, 'w') as f:
+            json.dump([{k:v for k,v in s.items() if k!='output'} for s in swept], f, indent=2)
+
+        if sheet and swept:
+            cells = [dict(file=s['file'], label=label(s)) for s in swept]
+            pool.map([dict(sheet=cells, cols=cols, dest='%s-sheet%s' % (base, ext))])
+    finally:
+        pool.close()
+
+    return swept
+
+def label(variant):
+    vals = ['%s=%s' % (k, '%g' % v if isinstance(v, float) else v) for k, v in variant['values'].items()]
+    return u'%i. %s' % (variant['index'], u', '.join(vals))
+
+class Pool(object):
+    """A set of worker processes (each running this module as a script) that render jobs in parallel
+
+    Subprocesses are used rather than a multiprocessing.Pool since forking a process that has
+    already initialized the ObjC runtime isn't safe.
+    """
+    def __init__(self, size):
+        site = dirname(dirname(dirname(abspath(__file__))))
+        script = abspath(__file__).replace('.pyc', '.py')
+        self.procs = []
+        for i in range(max(1, size)):
+            p = Popen([sys.executable, script], stdin=PIPE, stdout=PIPE)
+            p.stdin.write((json.dumps(dict(site=site, worker=True))+"\n").encode('utf-8'))
+            p.stdin.flush()
+            self.procs.append(p)
+
+    def map(self, jobs, callback=None):
+        """Returns a list with the result of each job (in the order they were passed)"""
+        results = [None] * len(jobs)
+        queue = list(enumerate(jobs))
+        idle = list(self.procs)
+        busy = {} # proc -> job index
+        done = 0
+
+        while queue or busy:
+            # hand out jobs to any idle workers
+            while queue and idle:
+                p = idle.pop()
+                i, job = queue.pop(0)
+                busy[p] = i
+                p.stdin.write((json.dumps(job)+"\n").encode('utf-8'))
+                p.stdin.flush()
+
+            if not busy:
+                # every worker has died, so there's no one left to render the remaining jobs
+                for i, job in queue:
+                    results[i] = dict(ok=False, output=u'no workers available\n')
+                break
+
+            readable, _, _ = select.select([p.stdout for p in busy], [], [])
+            for p in [p for p in busy if p.stdout in readable]:
+                i = busy.pop(p)
+                line = p.stdout.readline()
+                if line:
+                    results[i] = json.loads(line.decode('utf-8'))
+                    idle.append(p)
+                else:
+                    results[i] = dict(ok=False, output=u'worker exited unexpectedly\n')
+                    self.procs.remove(p)
+                done += 1
+                if callback:
+                    callback(done, i, results[i])
+        return results
+
+    def close(self):
+        for p in self.procs:
+            p.stdin.close()
+            p.wait()
+        self.procs = []
+
+
+### Worker-process routines ###
+
+def render(vm, job):
+    """Run the script with the job's var() values then save the canvas to its dest file"""
+    import random
+    from plotdevice.run import encoded
+    with open(job['file']) as f:
+        vm.path = job['file']
+        vm.source = f.read().decode(encoded(job['file']))
+    vm.metadata = dict(args=job['args'])
+    vm.context._presets = job['values']
+    random.seed(job['seed'])
+
+    # run the script (and draw the first frame if it's an animation)
+    outcomes = [vm.run()]
+    if outcomes[-1].ok is True and vm.animated:
+        for method in ('setup', 'draw'):
+            outcomes.append(vm.run(method))
+            if outcomes[-1].ok is not True:
+                break
+        outcomes.append(vm.stop())
+
+    ok = all(o.ok is True for o in outcomes)
+    output = u''.join(out.data for o in outcomes for out in o.output)
+    if not ok:
+        return dict(ok=False, output=output)
+
+    # bail out if any of the swept names don't match the script's var()s
+    declared = set(v.name for v in vm.vars)
+    unknown = sorted(name for name in job['values'] if name not in declared)
+    if unknown:
+        return dict(ok=False, unknown=unknown, output=output)
+
+    vm.canvas.save(job['dest'])
+    if vm.animated:
+        output += u'(only the first frame of the animation was rendered)\n'
+    return dict(ok=True, output=output)
+
+def contact_sheet(job):
+    """Draw thumbnails of each of the variants in a grid with a caption beneath each"""
+    from plotdevice.context import Context
+    cells = job['sheet']
+    cols = job['cols'] or int(ceil(sqrt(len(cells))))
+    rows = int(ceil(len(cells) / float(cols)))
+    pad, caption, thumb = 12, 16, 240
+
+    ctx = Context()
+    sizes = [ctx.imagesize(c['file']) for c in cells if c['file']]
+    w, h = sizes[0] if sizes else (thumb, thumb)
+    scale = thumb / float(max(w, h))
+    w, h = w*scale, h*scale
+
+    ctx.size(pad + cols*(w+pad), pad + rows*(h+caption+pad))
+    ctx.font(size=9)
+    for i, cell in enumerate(cells):
+        x = pad + (i % cols) * (w+pad)
+        y = pad + (i // cols) * (h+caption+pad)
+        if cell['file']:
+            ctx.image(cell['file'], x, y, width=w, height=h)
+        else:
+            ctx.rect(x, y, w, h, fill=0.9)
+        ctx.text(cell['label'], x, y+h+caption-4, fill=0.2)
+    ctx.canvas.save(job['dest'])
+    return dict(ok=True, output=u'')
+
+def serve(results):
+    """Render jobs read from stdin (one per line) and write their results to the `results` file"""
+    from plotdevice.run import Sandbox
+    from plotdevice.util.readers import cache_dir
+
+    # every worker loads the same images, so let them share the decoded bitmaps
+    os.environ.setdefault('PLOTDEVICE_IMAGE_CACHE', os.path.join(cache_dir, 'images'))
+    vm = Sandbox()
+    for line in iter(sys.stdin.readline, ''):
+        job = json.loads(line)
+        try:
+            result = contact_sheet(job) if 'sheet' in job else render(vm, job)
+        except Exception as e:
+            result = dict(ok=False, output=u'%s: %s\n' % (type(e).__name__, e))
+        results.write(json.dumps(result)+"\n")
+        results.flush()
+
+def coordinate(opts):
+    """Run a sweep on behalf of the command line tool and report on its progress"""
+    def report(done, total, variant):
+        if not variant['ok']:
+            sys.stderr.write('\n' + variant['output'])
+        sys.stderr.write('\r%i/%i variants rendered' % (done, total))
+        sys.stderr.flush()
+
+    from plotdevice import DeviceError
+    try:
+        swept = sweep(opts['file'], opts['sweep'], opts['export'], workers=opts.get('jobs'),
+                      args=opts.get('args') or [], progress=report)
+    except DeviceError as e:
+        sys.stderr.write('%s\n' % e)
+        sys.exit(1)
+    failed = [s for s in swept if not s['ok']]
+    sys.stderr.write('\n%i variants written%s\n' % (len(swept)-len(failed),
+                     ' (%i failed)' % len(failed) if failed else ''))
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    from site import addsitedir
+    OPTS = json.loads(sys.stdin.readline())
+    addsitedir(OPTS['site']) # make sure the plotdevice module is accessible
+
+    if OPTS.get('worker'):
+        # keep stray print statements from garbling the results
+        results = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+        sys.stdout = sys.stderr
+        serve(results)
+    else:
+        coordinate(OPTS)
@@ -0,0 +1,219 @@
+# encoding: utf-8
+"""
+worker.py
+
+Long-running renderer that keeps a warm interpreter around for console-based exports.
+
+This is the back-end of `plotdevice --serve`. It imports PyObjC and the plotdevice module once,
+then listens on a unix-domain socket for jobs submitted by `plotdevice script.pv --export ...
+--worker`. Like console.py, it expects its own parameters (the site dir and socket path) to be
+passed as a json blob piped to stdin.
+
+Each job is a single line of json containing the same options console.py would receive. Jobs run
+one at a time (in the order they arrive) in a fresh Sandbox and the worker replies with a series
+of json lines:
+    {"output": [[isErr, text], ...]}   console output from the script
+    {"progress": [written, total]}     export progress (sent each time it changes)
+    {"ok": true|false, "status": "complete"|"cancelled"|"failed",
+     "files": [...], "frames": N, "timings": {...}}
+
+The final message ends the job and the worker closes the connection. A client can halt its job by
+sending a line containing CANCEL (or by hanging up).
+"""
+
+import os
+import sys
+import json
+import socket
+import select
+import signal
+from time import time
+from site import addsitedir
+from os.path import exists, dirname
+from io import open
+
+STDERR = sys.stderr
+OPTS = json.loads(sys.stdin.readline())
+
+addsitedir(OPTS['site']) # make sure the plotdevice module is accessible
+from plotdevice.run import objc, encoded, Sandbox
+from plotdevice.util.readers import cache_dir
+from plotdevice.lib.cocoa import *
+from plotdevice.gui import set_timeout
+from PyObjCTools import AppHelper
+
+class Job(object):
+    """A single export request (and the client connection it arrived on)
+
+    Acts as the Sandbox's delegate while the export is running and relays its output and
+    progress to the client.
+    """
+    def __init__(self, conn):
+        self.conn = conn
+        self.buf = b''
+        self.opts = None
+        self.vm = None
+        self.ok = True
+        self.cancelled = False
+        self.hungup = False
+        self.timings = {}
+        self.files = []
+        self.frames = 0
+
+    def receive(self):
+        """Read from the client and parse the job options (or a cancellation)"""
+        data = self.conn.recv(4096)
+        if not data:
+            self.hungup = True
+            self.cancel()
+            return
+        self.buf += data
+        while b'\n' in self.buf:
+            line, self.buf = self.buf.split(b'\n', 1)
+            if self.opts is None:
+                self.opts = json.loads(line.decode('utf-8'))
+            elif b'CANCEL' in line:
+                self.cancel()
+
+    def send(self, **msg):
+        if self.hungup:
+            return
+        try:
+            self.conn.sendall((json.dumps(msg)+"\n").encode('utf-8'))
+        except socket.error:
+            self.hungup = True
+
+    def start(self, done):
+        """Render the script in a fresh Sandbox, calling `done` once the export completes"""
+        self._done = done
+        self.started = time()
+        opts = self.opts
+        try:
+            # exports will stall if `last` isn't an int (see console.py)
+            if not opts.get('last', None):
+                opts['last'] = opts.get('first', 1)
+
+            self.vm = Sandbox(delegate=self)
+            self.vm.path = opts['file']
+            self.vm.source = open(opts['file'], encoding=encoded(opts['file'])).read()
+            self.vm.metadata = opts
+
+            format = opts['export'].rsplit('.',1)[1]
+            kind = 'movie' if format in ('mov','gif') else 'image'
+            self.vm.export(kind, opts['export'], opts)
+        except Exception as e:
+            self.send(output=[[True, u'%s: %s\n' % (type(e).__name__, e)]])
+            self.ok = False
+            self.finish()
+
+    def cancel(self):
+        session = getattr(self.vm, 'session', None)
+        if session:
+            session.cancel()
+
+    def finish(self):
+        self.timings['total'] = time() - self.started
+        # a script error mid-export also cancels the session, so check for failure first
+        status = 'failed' if not self.ok else 'cancelled' if self.cancelled else 'complete'
+        self.send(ok=status=='complete', status=status, files=self.files,
+                  frames=self.frames, timings=self.timings)
+        self.conn.close()
+        self.vm = None # break the delegate cycle
+        self._done(self)
+
+    ### Sandbox delegate methods ###
+
+    def exportFrame(self, status, canvas=None):
+        if 'firstpass' not in self.timings:
+            # the first call follows the script's compilation & top-level run
+            self.timings['firstpass'] = time() - self.started
+        if status.output:
+            self.send(output=[list(o) for o in status.output])
+        if not status.ok:
+            self.ok = False
+            if self.vm.session is None:
+                self.finish() # the script failed before the export session began
+
+    def exportStatus(self, event):
+        session = self.vm.session
+        if event == 'cancelled':
+            self.cancelled = True
+        elif event == 'complete':
+            self.files, self.frames = session.files, session.added
+            self.finish()
+
+    def exportProgress(self, written, total, cancelled):
+        self.send(progress=[written, total])
+
+class Worker(NSObject):
+    """Accepts connections on a unix-domain socket and runs their jobs sequentially"""
+
+    def initWithSocket_(self, path):
+        if exists(path):
+            os.unlink(path)
+        if not exists(dirname(path)):
+            os.makedirs(dirname(path))
+        self.path = path
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(16)
+        self.jobs = []    # connected clients (in order of arrival)
+        self.active = None # the job currently being rendered
+        self.timer = set_timeout(self, "poll:", 0.05, repeat=True)
+        return self
+
+    def poll_(self, timer):
+        socks = [self.server] + [job.conn for job in self.jobs]
+        readable, _, _ = select.select(socks, [], [], 0)
+        for sock in readable:
+            if sock is self.server:
+                conn, _ = self.server.accept()
+                self.jobs.append(Job(conn))
+            else:
+                job = next(j for j in self.jobs if j.conn is sock)
+                try:
+                    job.receive()
+                except ValueError:
+                    job.send(ok=False, status='failed', output=[[True, u'malformed job\n']])
+                    job.hungup = True
+
+        # forget about clients that disconnected before their job started
+        for job in [j for j in self.jobs if j.hungup and j is not self.active]:
+            job.conn.close()
+            self.jobs.remove(job)
+
+        # start the next job once the previous one has finished
+        if self.active is None:
+            for job in self.jobs:
+                if job.opts is not None:
+                    self.active = job
+                    job.start(self.finished)
+                    break
+
+    def finished(self, job):
+        if job in self.jobs:
+            self.jobs.remove(job)
+        if self.active is job:
+            self.active = None
+
+    def shutdown(self):
+        self.timer.invalidate()
+        self.server.close()
+        if exists(self.path):
+            os.unlink(self.path)
+
+if __name__ == '__main__':
+    # each job gets a fresh Sandbox, so hand decoded images between them through the disk cache
+    os.environ.setdefault('PLOTDEVICE_IMAGE_CACHE', os.path.join(cache_dir, 'images'))
+
+    app = NSApplication.sharedApplication()
+    app.setActivationPolicy_(NSApplicationActivationPolicyAccessory)
+    worker = Worker.alloc().initWithSocket_(OPTS['socket'])
+    STDERR.write('plotdevice worker listening on %s\n' % OPTS['socket'])
+
+    def quit(*args):
+        worker.shutdown()
+        AppHelper.stopEventLoop()
+    signal.signal(signal.SIGINT, quit)
+    signal.signal(signal.SIGTERM, quit)
+    AppHelper.runEventLoop(installInterrupt=False)
@@ -11,9 +11,9 @@ from random import choice, shuffle
 
 from Foundation import NSAutoreleasePool
 from plotdevice import DeviceError
-from .readers import read, XMLParser
+from .readers import read, read_many, XMLParser
 
-__all__ = ('grid', 'random', 'shuffled', 'choice', 'ordered', 'order', 'files', 'read', 'autotext', '_copy_attr', '_copy_attrs', 'odict', 'ddict', 'adict')
+__all__ = ('grid', 'random', 'shuffled', 'choice', 'ordered', 'order', 'files', 'read', 'read_many', 'autotext', '_copy_attr', '_copy_attrs', 'odict', 'ddict', 'adict')
 
 ### Utilities ###
 
@@ -69,20 +69,27 @@ def random(v1=None, v2=None, mean=None, sd=None):
     else: # No values means 0.0 -> 1.0
         return random.random()
 
-def files(path="*", case=True):
+def files(path="*", case=True, prefetch=None):
     """Returns a list of files.
 
     You can use wildcards to specify which files to pick, e.g.
         f = files('~/Pictures/*.jpg')
 
     For a case insensitive search, call files() with case=False
+
+    When listing images, pass an integer as `prefetch` to have that many files
+    loaded in the background ahead of the one currently being iterated over
     """
     from iglob import iglob
     if type(path)==unicode:
         path.encode('utf-8')
     path = os.path.expanduser(path)
 
-    return list(iglob(path.decode('utf-8'), case=case))
+    found = list(iglob(path.decode('utf-8'), case=case))
+    if prefetch:
+        from plotdevice.gfx.image import Lookahead
+        return Lookahead(found, prefetch)
+    return found
 
 def autotext(sourceFile):
     from plotdevice.util.kgp import KantGenerator
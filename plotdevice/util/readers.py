@@ -1,21 +1,28 @@
 # encoding: utf-8
 import os, sys, re
-from operator import attrgetter
+import shutil, tempfile
+from array import array
 PY2 = sys.version_info[0] == 2
 
 # files & io
-from io import open, StringIO, BytesIO
+from io import open, StringIO, BytesIO, BufferedReader, TextIOWrapper, RawIOBase
 from os.path import abspath, dirname, exists, join, splitext
 from plotdevice import DeviceError, INTERNAL
 text_type = str if not PY2 else unicode
 
 # data formats
 import json, csv
-from collections import namedtuple, defaultdict
-from codecs import iterencode, iterdecode
+import zlib, bz2
+import cPickle as pickle
+from hashlib import sha1
+from collections import namedtuple, defaultdict, OrderedDict
+from codecs import iterencode, lookup
+from itertools import islice, izip_longest
 from xml.parsers import expat
 
 # http
+import threading
+from multiprocessing.pool import ThreadPool
 from urlparse import urlparse
 from Foundation import NSDateFormatter, NSLocale, NSTimeZone, NSDate
 
@@ -28,9 +35,22 @@ doctype = '<!DOCTYPE plod [ %s ]>' % "".join(['<!ENTITY %s "&#xE0%s;" >'%e for e
 HEAD = u"%s<%s>" % (doctype, INTERNAL)
 TAIL = u"</%s>" % INTERNAL
 class XMLParser(object):
+    """Converts an xml string into a plain-text body, styled runs, and a lookup table of Elements
+
+    The parser can be used in one of two ways. Passing a string to the constructor will parse
+    it in its entirety and make the results available through the .text, .regions, and .nodes
+    attributes. Alternatively, calling stream() on a parser created without a string will feed
+    the xml to expat in chunks and yield each successive portion of the body (along with its
+    styled runs) as soon as it's been parsed.
+
+    Runs are stored compactly as (start, length, selector-id) triples in a flat array. The ids
+    refer to the unique tag-cascades in .selectors, and adjacent runs with the same cascade are
+    merged as they're encountered.
+    """
     _log = 0
+    chunksize = 65536
 
-    def __init__(self, txt, offset=0):
+    def __init__(self, txt=None, offset=0):
         # configure the parsing machinery/callbacks
         p = expat.ParserCreate()
         p.StartElementHandler = self._enter
@@ -44,32 +64,115 @@ class XMLParser(object):
         # set up state attrs to record the parse results
         self.stack = []
         self.cursor = offset
-        self.regions = defaultdict(list)
         self.nodes = defaultdict(list)
         self.body = []
+        self.selectors = []
+        self._selector_ids = {}
+        self._runs = array('l')
+        self._slots = []
+        self._crlf = None
+
+        # hang onto the bytes since the start of the current line (for error messages and
+        # for peeking at the markup when self-closed tags are encountered)
+        self._window, self._window_start = b'', 0
 
         # wrap everything in a root node (and include the whitespace entities which shift
         # the tty escapes into the unicode PUA for the duration)
-        if isinstance(txt, text_type):
-            txt = txt.encode('utf-8')
-        self._xml = HEAD.encode('utf-8') + txt + TAIL.encode('utf-8')
+        self._parse(HEAD.encode('utf-8'))
 
         # parse the input xml string
-        try:
-            self._expat.Parse(self._xml, True)
-        except expat.ExpatError, e:
-            self._expat_error(e)
+        if txt is not None:
+            self.feed(txt)
+            self.close()
+
+    def feed(self, txt):
+        """Parse a portion of the document (in chunks if it's longer than the chunksize)"""
+        for chunk in self._chunks(txt):
+            self._parse(chunk)
+
+    def close(self):
+        """Finish parsing the document (closing the wrapper element)"""
+        self._parse(TAIL.encode('utf-8'), final=True)
+
+    def stream(self, txt):
+        """Parse the xml string chunk-by-chunk, yielding a (text, runs) tuple after each one.
+
+        The text is the portion of the body that was completed by the chunk and runs is a list
+        of (selector, start, length) tuples whose start indices are relative to that text.
+        The yielded portions are discarded by the parser (so .text and .regions will only reflect
+        whatever has been parsed since the last one) but the .nodes table is retained in full.
+        """
+        for chunk in self._chunks(txt):
+            self._parse(chunk)
+            if self.body:
+                yield self.flush()
+        self.close()
+        if self.body:
+            yield self.flush()
+
+    def flush(self):
+        """Return the body text & runs parsed so far (as in stream()) then discard them"""
+        text = self.text
+        base = self.cursor - self._offset - len(text)
+        runs = self._runs
+        found = [(self.selectors[runs[i+2]], runs[i]-base, runs[i+1]) for i in xrange(0, len(runs), 3)]
+        self.body = []
+        self._runs = array('l')
+        return text, found
 
     @property
     def text(self):
         # returns the processed string (with all markup removed and tty-escapes un-shifted)
         return u"".join(self.body).translate({0xE000+v:v for v in (8,9,12)})
 
+    @property
+    def regions(self):
+        # returns a dict mapping tag-cascade tuples to lists of (start, length) ranges
+        regions = defaultdict(list)
+        runs = self._runs
+        for i in xrange(0, len(runs), 3):
+            regions[self.selectors[runs[i+2]]].append((runs[i], runs[i+1]))
+        return regions
+
+    def _chunks(self, txt):
+        # divide the string into byte-strings of roughly chunksize length (taking care not to
+        # split a surrogate pair when slicing unicode on a `narrow' build)
+        n = self.chunksize
+        if not isinstance(txt, text_type):
+            for i in xrange(0, len(txt), n):
+                yield txt[i:i+n]
+            return
+        i = 0
+        while i < len(txt):
+            j = i + n
+            if j < len(txt) and u'\ud800' <= txt[j-1] <= u'\udbff':
+                j += 1
+            yield txt[i:j].encode('utf-8')
+            i = j
+
+    def _parse(self, data, final=False):
+        self._window += data
+        try:
+            self._expat.Parse(data, final)
+        except expat.ExpatError, e:
+            self._expat_error(e)
+
+        # discard everything before the final line-break
+        cut = self._window.rfind(b'\n') + 1
+        if cut:
+            self._window = self._window[cut:]
+            self._window_start += cut
+
     def _expat_error(self, e):
+        # find the line containing the error within the current window
+        at = self._expat.ErrorByteIndex - self._window_start
+        head = self._window.rfind(b'\n', 0, max(at, 0)) + 1
+        tail = self._window.find(b'\n', head)
+        line = self._window[head:tail if tail>=0 else None].decode('utf-8', 'replace')
+
         # correct the column and line-string for our wrapper element
         col = e.offset
         err = u"\n".join(e.args)
-        line = self._xml.decode('utf-8').split("\n")[e.lineno-1]
         if line.startswith(HEAD):
             line = line[len(HEAD):]
             col -= len(HEAD)
@@ -117,47 +220,71 @@ class XMLParser(object):
         parents = tuple(reversed([e.tag for e in self.stack[1:]]))
         elt = Element(name, attrs, parents, self.cursor, end=None)
         self.stack.append(elt)
+
+        # reserve the node's place in the lookup table (so the lists remain sorted by start)
+        self._slots.append(len(self.nodes[name]))
+        self.nodes[name].append(elt)
         self.log(u'<%s>'%(name), indent=1)
 
     def _chars(self, data):
         selector = tuple([e.tag for e in self.stack])
 
         # handle special case where a self-closed tag precedes a '\n'
-        if hasattr(self, '_crlf'):
-            if data == "\n":
-                selector = selector + (self._crlf.tag,)
-            del self._crlf
+        if self._crlf:
+            node, slot, at = self._crlf
+            if data == "\n" and self._expat.CurrentByteIndex == at:
+                selector = selector + (node.tag,)
+                self.nodes[node.tag][slot] = node._replace(end=node.start+1)
+            self._crlf = None
+
+        # look up the selector's id then either extend the previous run or start a new one
+        sel_id = self._selector_ids.get(selector)
+        if sel_id is None:
+            sel_id = self._selector_ids[selector] = len(self.selectors)
+            self.selectors.append(selector)
+        start, runs = self.cursor-self._offset, self._runs
+        if runs and runs[-1]==sel_id and runs[-3]+runs[-2]==start:
+            runs[-2] += len(data)
+        else:
+            runs.extend((start, len(data), sel_id))
 
-        self.regions[selector].append(tuple([self.cursor-self._offset, len(data)]))
         self.cursor += len(data)
         self.body.append(data)
         self.log(data)
 
     def _leave(self, name):
         node = self.stack.pop()._replace(end=self.cursor)
+        slot = self._slots.pop()
+        self.nodes[name][slot] = node
 
         # hang onto line-ending self-closed tags so they can be applied to the next '\n' in _chars
         if node.start==node.end:
             at = self._expat.CurrentByteIndex
-            if self._xml[at-2:at]=='/>' and self._xml[at:at+1]=="\n":
-                node = node._replace(end=node.start+1)
-                self._crlf = node
+            i = at - self._window_start
+            if i>=2 and self._window[i-2:i]==b'/>':
+                self._crlf = (node, slot, at)
 
-        self.nodes[name].append(node)
         self.log(u'</%s>'%(name), indent=-1)
 
         # if we've exited the root node, clean up the parsed elements
         if name == INTERNAL:
             del self.nodes[INTERNAL]
-            self.nodes = {tag:sorted(elts, key=attrgetter('start')) for tag,elts in self.nodes.items()}
+            self.nodes = dict(self.nodes)
 
 
 ### CSV unpacking ###
 
-def csv_rows(file_obj, dialect=csv.excel, **kwargs):
-    csvfile = iterencode(file_obj, 'utf-8') if PY2 else file_obj
-    csvreader = csv.reader(csvfile, dialect=dialect, **kwargs)
-    csvreader = (list(iterdecode(i, 'utf-8')) for i in csvreader) if PY2 else csvreader
+def csv_rows(file_obj, dialect=csv.excel, encoding=None, **kwargs):
+    if PY2 and encoding:
+        # a byte stream can go straight to the csv module (decoding each field afterward)
+        csvreader = csv.reader(file_obj, dialect=dialect, **kwargs)
+        csvreader = ([field.decode(encoding) for field in row] for row in csvreader)
+    elif PY2:
+        csvfile = iterencode(file_obj, 'utf-8')
+        csvreader = csv.reader(csvfile, dialect=dialect, **kwargs)
+        csvreader = ([field.decode('utf-8') for field in row] for row in csvreader)
+    else:
+        csvreader = csv.reader(file_obj, dialect=dialect, **kwargs)
     for row in csvreader:
         yield row
 
@@ -182,28 +309,115 @@ def csv_tuple(file_obj, dialect=csv.excel, cols=None, **kwargs):
             continue
         yield RowType(**dict(zip(cols, row)))
 
+def csv_columns(file_obj, dialect=csv.excel, cols=None, dtypes=None, chunksize=65536, **kwargs):
+    """Yields OrderedDicts mapping column names to numpy arrays for successive chunks of rows
+
+    Column types can be set by passing a dict of names and numpy dtypes. Any columns that
+    are omitted will be parsed as integers, floats, or unicode (whichever the first chunk
+    of values is compatible with).
+    """
+    try:
+        import numpy
+    except ImportError:
+        unsupported = 'could not find the "numpy" library (try running "pip install numpy" first)'
+        raise RuntimeError(unsupported)
+
+    rows = csv_rows(file_obj, dialect, **kwargs)
+    if not isinstance(cols, (list, tuple)):
+        cols = next(rows, [])
+    dtypes = dict(dtypes or {})
+
+    while True:
+        chunk = list(islice(rows, chunksize))
+        if not chunk:
+            break
+
+        columns = OrderedDict()
+        for name, values in zip(cols, izip_longest(*chunk, fillvalue=u'')):
+            if name not in dtypes:
+                # settle on a type for the column based on its initial values
+                for dtype in (int, float, text_type):
+                    try:
+                        columns[name] = numpy.array(values, dtype=dtype)
+                        dtypes[name] = dtype
+                        break
+                    except ValueError:
+                        continue
+                continue
+
+            try:
+                columns[name] = numpy.array(values, dtype=dtypes[name])
+            except ValueError as e:
+                badval = 'csv column %r could not be read as %s (%s). Try passing a `dtypes` dict to read()' % (name, numpy.dtype(dtypes[name]), e)
+                raise DeviceError(badval)
+        yield columns
+
+def csv_concat(chunks):
+    """Combines the chunks yielded by csv_columns into a single array per column"""
+    import numpy
+    parts = OrderedDict()
+    for chunk in chunks:
+        for name, arr in chunk.items():
+            parts.setdefault(name, []).append(arr)
+    return OrderedDict((name, numpy.concatenate(arrs)) for name, arrs in parts.items())
+
 def csv_dialect(fd):
-    snippet = fd.read(1024).encode('utf-8') if PY2 else fd.read(1024)
+    snippet = fd.read(1024)
+    if PY2 and isinstance(snippet, unicode):
+        snippet = snippet.encode('utf-8')
     fd.seek(0)
     return csv.Sniffer().sniff(snippet)
 
 
 ### HTTP utils ###
 
-try:
-    import requests
-    from cachecontrol import CacheControl, CacheControlAdapter
-    from cachecontrol.caches import FileCache
-    from cachecontrol.heuristics import LastModified
-
-    cache_dir = '%s/Library/Caches/PlotDevice'%os.environ['HOME']
-    HTTP = CacheControl(requests.Session(), cache=FileCache(cache_dir), heuristic=LastModified())
-except ImportError:
-    class Decoy(object):
-        def get(self, url):
+cache_dir = '%s/Library/Caches/PlotDevice'%os.environ['HOME']
+
+class Session(object):
+    """A requests session that isn't created (nor the requests module imported) until first use
+
+    If `cached` is True, responses are stored in the cache_dir and reused based on their
+    Cache-Control and Last-Modified headers. Either way the session's connection pool is sized
+    to be shared by the Fetcher's threads.
+    """
+    def __init__(self, cached=False):
+        self.cached = cached
+        self._session = None
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = self._connect()
+            return self._session
+
+    def _connect(self):
+        try:
+            import requests
+            from cachecontrol import CacheControlAdapter
+            from cachecontrol.caches import FileCache
+            from cachecontrol.heuristics import LastModified
+            from requests.adapters import HTTPAdapter
+        except ImportError:
             unsupported = 'could not find the "requests" library (try running "python setup.py build" first)'
             raise RuntimeError(unsupported)
-    HTTP = Decoy()
+
+        pool = dict(pool_connections=8, pool_maxsize=16)
+        if self.cached:
+            adapter = CacheControlAdapter(cache=FileCache(cache_dir), heuristic=LastModified(), **pool)
+        else:
+            adapter = HTTPAdapter(**pool)
+
+        sess = requests.Session()
+        for scheme in ('http://', 'https://'):
+            sess.mount(scheme, adapter)
+        return sess
+
+HTTP = Session(cached=True)
 
 def binaryish(content, format):
     bin_types = ('pdf','eps','png','jpg','jpeg','gif','tiff','tif','zip','tar','gz')
@@ -226,10 +440,211 @@ def last_modified(resp):
         last_mod = NSDate.date()
     return last_mod.timeIntervalSince1970()
 
+Resource = namedtuple('Resource', ['url', 'content', 'mtime', 'etag', 'modified'])
+
+class Fetcher(object):
+    """Retrieves urls with conditional GETs so unchanged resources aren't re-downloaded
+
+    Calling get() returns a Resource with the url's content and modification time. If the
+    caller indicates that it's holding onto the content from a previous call (by passing
+    cached=True), the ETag and Last-Modified validators from the prior response are sent
+    along and a `304 Not Modified' reply results in a Resource whose content is None.
+
+    Within a single run, a url that's been retrieved once isn't revalidated again (until
+    reset() is called). Threads requesting the same url concurrently will share the result
+    of a single request.
+    """
+    def __init__(self, session):
+        self.session = session
+        self._validators = {} # url -> Resource (with content=None)
+        self._seen = {}       # urls retrieved since the last reset()
+        self._pending = {}    # url -> Event for in-flight requests
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget which urls have been retrieved in the current run"""
+        with self._lock:
+            self._seen.clear()
+
+    def get(self, url, cached=False):
+        with self._lock:
+            seen = self._seen.get(url)
+            if seen and cached:
+                return seen
+            pending = self._pending.get(url)
+            leader = pending is None
+            if leader:
+                pending = self._pending[url] = threading.Event()
+
+        if not leader:
+            # another thread is already fetching this url so share its result (unless
+            # that request failed or we need the content but it wasn't downloaded)
+            pending.wait()
+            result = getattr(pending, 'result', None)
+            if result and (cached or result.content is not None):
+                return result
+            return self._fetch(url, cached)
+
+        try:
+            pending.result = self._fetch(url, cached)
+            return pending.result
+        finally:
+            with self._lock:
+                del self._pending[url]
+            pending.set()
+
+    def _fetch(self, url, cached):
+        headers = {}
+        known = self._validators.get(url) if cached else None
+        if known:
+            if known.etag:
+                headers['If-None-Match'] = known.etag
+            if known.modified:
+                headers['If-Modified-Since'] = known.modified
+
+        resp = self.session.get(url, headers=headers)
+        if known and resp.status_code == 304:
+            result = known
+        else:
+            resp.raise_for_status()
+            result = Resource(url, resp.content, last_modified(resp),
+                              resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+
+        with self._lock:
+            self._validators[url] = self._seen[url] = result._replace(content=None)
+        return result
+
+FETCHER = Fetcher(HTTP)
+
+
+### Compressed input ###
+
+COMPRESSED = {'.gz':'gzip', '.gzip':'gzip', '.tgz':'gzip', '.bz2':'bz2', '.xz':'xz', '.lzma':'xz'}
+# bz2 streams start with a block-size digit then either a block header or the end-of-stream marker
+MAGIC = [(re.compile(br'\x1f\x8b'), 'gzip'),
+         (re.compile(br'BZh[1-9](1AY&SY|\x17rE8P\x90)'), 'bz2'),
+         (re.compile(br'\xfd7zXZ\x00'), 'xz')]
+MAGIC_LEN = 10 # the number of initial bytes needed to match any of the signatures
+
+def compression(pth, head, format=None):
+    """Returns the codec needed to decompress a file (based on its extension or initial bytes)
+
+    Passing 'gz', 'bz2', or 'xz' as the `format` disables decompression (so the raw bytes
+    will be returned by read()).
+    """
+    if format and '.%s' % format.lstrip('.') in COMPRESSED:
+        return None
+    ext = splitext(pth)[-1].lower()
+    if ext in COMPRESSED:
+        return COMPRESSED[ext]
+    for magic, codec in MAGIC:
+        if magic.match(head):
+            return codec
+    return None
+
+def content_ext(pth):
+    """Returns the extension of a compressed file's contents (e.g., '.csv' for data.csv.gz)"""
+    root, ext = splitext(pth)
+    if ext.lower() == '.tgz':
+        return '.tar'
+    if ext.lower() in COMPRESSED:
+        root, ext = splitext(root)
+    return ext.lower()
+
+class Decompressor(RawIOBase):
+    """A read-only stream of the decompressed contents of a gzip, bz2, or xz file object
+
+    Data is decompressed incrementally as it is read, so neither the full compressed nor
+    decompressed file has to fit in memory. The stream can be rewound to the beginning
+    (which restarts the decompression) but doesn't support other seeks.
+    """
+    chunksize = 65536
+
+    def __init__(self, fileobj, codec):
+        super(Decompressor, self).__init__()
+        self.fileobj = fileobj
+        self.codec = codec
+        self._pos = None
+        self.seek(0)
+
+    def _decompressor(self):
+        if self.codec == 'gzip':
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.codec == 'bz2':
+            return bz2.BZ2Decompressor()
+        try:
+            import lzma
+        except ImportError:
+            try:
+                from backports import lzma
+            except ImportError:
+                unsupported = 'could not find the "lzma" library (try running "pip install backports.lzma" first)'
+                raise RuntimeError(unsupported)
+        return lzma.LZMADecompressor()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=0):
+        if whence==1 and offset==0 or whence==0 and offset==self._pos:
+            return self._pos
+        elif whence!=0 or offset!=0:
+            unseekable = 'compressed streams can only be rewound to the beginning'
+            raise IOError(unseekable)
+
+        self.fileobj.seek(0)
+        self._engine = self._decompressor()
+        self._pending = b''
+        self._pos = 0
+        self._eof = False
+        return 0
+
+    def readinto(self, b):
+        while not self._pending and not self._eof:
+            data = self.fileobj.read(self.chunksize)
+            if not data:
+                self._eof = True
+                if hasattr(self._engine, 'flush'):
+                    self._pending = self._engine.flush()
+            else:
+                self._pending = self._decompress(data)
+
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        self._pos += n
+        return n
+
+    def _decompress(self, data):
+        try:
+            out = self._engine.decompress(data)
+        except EOFError:
+            # a new stream began right at a chunk boundary (e.g., a multi-member .bz2 file)
+            self._engine = self._decompressor()
+            out = self._engine.decompress(data)
+
+        # start a fresh decompressor whenever one stream ends and another begins
+        while getattr(self._engine, 'unused_data', b''):
+            rest = self._engine.unused_data
+            self._engine = self._decompressor()
+            out += self._engine.decompress(rest)
+        return out
+
+    def close(self):
+        if not self.closed:
+            self.fileobj.close()
+        super(Decompressor, self).close()
+
 
 ### File/URL Reader ###
 
-def read(pth, format=None, encoding=None, cols=None, **kwargs):
+def read(pth, format=None, encoding=None, cols=None, stream=False, columns=False, dtypes=None, sidecar=False, **kwargs):
     """Returns the contents of a file into a string or format-dependent data
     type (with special handling for json and csv files).
 
@@ -248,8 +663,33 @@ def read(pth, format=None, encoding=None, cols=None, **kwargs):
     using those names as keys. If the file doesn't define its own column names,
     you can pass a list of strings as the `cols` parameter. Rows can be formatted
     as column-keyed dictionaries by passing True as the `dict` parameter.
-    """
 
+    Passing stream=True will return an iterator rather than a list, allowing
+    CSV rows (or the lines of a text file) to be processed one at a time without
+    loading the whole file into memory.
+
+    With columns=True, CSV files are parsed into an OrderedDict mapping column
+    names to numpy arrays. Types are inferred from the data but can be set for
+    particular columns by passing a `dtypes` dict of column names and numpy
+    dtypes. When combined with stream=True, the file is parsed in chunks and
+    the iterator yields a dict of arrays for each successive group of rows.
+
+    Parsing a large file on every run can be avoided by passing sidecar=True,
+    which saves the result to ~/Library/Caches/PlotDevice/read (or the directory
+    passed as `sidecar`). Later calls with the same options reuse the saved copy
+    until the file is modified. Columnar data is stored as .npy files and loaded
+    as read-only memory-mapped arrays.
+    """
+    if sidecar and not stream and not re.match(r'https?:', pth):
+        opts = dict(kwargs, format=format, encoding=encoding, cols=cols, columns=columns, dtypes=dtypes)
+        saved = Sidecar(pth, opts, sidecar)
+        if saved.exists:
+            return saved.load()
+        result = read(pth, format, encoding, cols, columns=columns, dtypes=dtypes, **kwargs)
+        saved.save(result)
+        return result
+
+    raw_csv = None # the encoding of a byte stream that should be passed directly to the csv module
     if re.match(r'https?:', pth):
         resp = HTTP.get(pth)
         resp.raise_for_status()
@@ -261,7 +701,14 @@ def read(pth, format=None, encoding=None, cols=None, **kwargs):
             if data_t in content_type:
                 extension_type = data_t
 
-        if binaryish(content_type, format):
+        codec = compression(urlparse(pth).path, resp.content[:MAGIC_LEN], format)
+        if codec:
+            # unpack gzip/bz2/xz payloads and treat them like the file they contain
+            extension_type = content_ext(urlparse(pth).path)
+            fd = BufferedReader(Decompressor(BytesIO(resp.content), codec))
+            if not binaryish(extension_type, format):
+                fd = TextIOWrapper(fd, encoding=encoding or 'utf-8')
+        elif binaryish(content_type, format):
             fd = BytesIO(resp.content)
         else:
             if encoding:
@@ -271,12 +718,24 @@ def read(pth, format=None, encoding=None, cols=None, **kwargs):
             fd = StringIO(resp.text)
     else:
         enc = encoding or 'utf-8'
+        pth = os.path.expanduser(pth)
+        fd = open(pth, 'rb')
         extension_type = splitext(pth)[-1].lower()
 
+        codec = compression(pth, fd.read(MAGIC_LEN), format)
+        fd.seek(0)
+        if codec:
+            # decompress on the fly (and use the inner file's extension, if any)
+            extension_type = content_ext(pth)
+            fd = BufferedReader(Decompressor(fd, codec))
+
         if binaryish(extension_type, format):
-            fd = open(os.path.expanduser(pth), 'rb')
+            pass
+        elif PY2 and (format or extension_type).lstrip('.')=='csv' and lookup(enc).name in CSV_BYTES:
+            # skip decoding the file only to re-encode it for py2's bytes-only csv module
+            raw_csv = enc
         else:
-            fd = open(os.path.expanduser(pth), 'rt', encoding=enc)
+            fd = TextIOWrapper(fd, encoding=enc)
 
     if kwargs.get('dict') is True:
         kwargs['dict'] = dict
@@ -289,12 +748,217 @@ def read(pth, format=None, encoding=None, cols=None, **kwargs):
         return json.load(fd, object_pairs_hook=dict_type)
     elif format=='csv':
         dialect = csv_dialect(fd)
-        if cols:
-            if kwargs.get('dict'):
-                return list(csv_dict(fd, dialect=dialect, cols=cols, dict=dict_type))
-            else:
-                return list(csv_tuple(fd, dialect=dialect, cols=cols))
-        return list(csv_rows(fd, dialect=dialect))
+        if columns:
+            rows = csv_columns(fd, dialect=dialect, cols=cols, dtypes=dtypes, encoding=raw_csv)
+            return closing_iter(fd, rows) if stream else csv_concat(rows)
+        elif cols and kwargs.get('dict'):
+            rows = csv_dict(fd, dialect=dialect, cols=cols, dict=dict_type, encoding=raw_csv)
+        elif cols:
+            rows = csv_tuple(fd, dialect=dialect, cols=cols, encoding=raw_csv)
+        else:
+            rows = csv_rows(fd, dialect=dialect, encoding=raw_csv)
+        return closing_iter(fd, rows) if stream else list(rows)
+    elif stream:
+        return closing_iter(fd, fd)
     else:
         return fd.read()
 
+def read_many(urls, workers=8, **kwargs):
+    """Reads a list of urls (or file paths) concurrently and returns their contents
+
+    Each item is fetched and parsed exactly as read() would (with any keyword arguments
+    passed along to it) using a pool of up to `workers` threads sharing the HTTP session's
+    connection pool. The results are returned in the same order as the input list. If a
+    particular item couldn't be read, its slot will contain the exception that was raised
+    rather than the data, e.g.:
+
+        for url, data in zip(urls, read_many(urls)):
+            if isinstance(data, Exception):
+                print "skipping %s (%s)" % (url, data)
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+
+    def fetch(url):
+        try:
+            return read(url, **kwargs)
+        except Exception as e:
+            return e
+
+    pool = ThreadPool(min(workers, len(urls)))
+    try:
+        return pool.map(fetch, urls)
+    finally:
+        pool.close()
+
+CSV_BYTES = ('utf-8', 'ascii', 'iso8859-1', 'cp1252', 'mac-roman')
+
+def closing_iter(fd, items):
+    """Yields the items from an iterator, closing the file it's reading from once it's exhausted"""
+    try:
+        for item in items:
+            yield item
+    finally:
+        fd.close()
+
+class ReadCache(object):
+    """Memoizes read() calls so a file parsed in an animation's draw() is only read once per run
+
+    Results are keyed by the file's path, modification time, and the options passed to read().
+    Every call returns the same read-only copy of the data (so a cache hit costs nothing no matter
+    how large the file is). Callers that want to modify the result in place can pass copy=True
+    to get a private copy instead. The `hits` and `misses` attributes count lookups since the
+    start of the current run.
+    """
+    def __init__(self):
+        self.clear()
+
+    def __repr__(self):
+        return "ReadCache(results=%i, hits=%i, misses=%i)" % (len(self._results), self.hits, self.misses)
+
+    def clear(self):
+        self._results = {}
+        self.hits = self.misses = 0
+
+    def read(self, pth, *args, **kwargs):
+        private = kwargs.pop('copy', False)
+        if not kwargs.pop('cache', True) or kwargs.get('stream'):
+            return read(pth, *args, **kwargs)
+
+        if re.match(r'https?:', pth):
+            src, mtime = pth, None
+        else:
+            src = abspath(os.path.expanduser(pth))
+            try:
+                mtime = os.path.getmtime(src)
+            except OSError:
+                return read(pth, *args, **kwargs) # let read() report the missing file
+        key = repr((src, mtime, args, sorted(kwargs.items(), key=repr)))
+
+        if key in self._results:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._results[key] = frozen(read(pth, *args, **kwargs))
+        return thawed(self._results[key]) if private else self._results[key]
+
+class ReadOnly(object):
+    """Mixin for the lists & dicts in a memoized read() result (which is shared between calls)"""
+    def _readonly(self, *args, **kwargs):
+        readonly = "The result of read() is shared between calls (pass copy=True to get one you can modify)"
+        raise TypeError(readonly)
+    __setitem__ = __delitem__ = __setslice__ = __delslice__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = remove = reverse = sort = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce_ex__(self, protocol):
+        # pickles and copies are made from the equivalent modifiable container
+        items = list(self.items()) if isinstance(self, dict) else list(self)
+        return self._base, (items,)
+
+    def copy(self):
+        base, args = self.__reduce_ex__(2)
+        return base(*args)
+
+_frozen_types = {}
+def frozen_type(cls):
+    """Returns a read-only subclass of a list or dict type (with the same name for repr's sake)"""
+    if cls not in _frozen_types:
+        _frozen_types[cls] = type(cls.__name__, (ReadOnly, cls), dict(_base=cls))
+    return _frozen_types[cls]
+
+def frozen(obj):
+    """Returns a read-only version of a read() result with its lists & dicts replaced by ReadOnly
+    equivalents and its numpy arrays marked as non-writeable"""
+    if isinstance(obj, list):
+        return frozen_type(type(obj))(frozen(v) for v in obj)
+    elif isinstance(obj, dict) and not isinstance(obj, defaultdict):
+        cls, ro_cls = type(obj), frozen_type(type(obj))
+        ro = ro_cls.__new__(ro_cls)
+        cls.__init__(ro)
+        for k, v in obj.items():
+            super(ReadOnly, ro).__setitem__(k, frozen(v))
+        return ro
+    elif hasattr(obj, 'flags'):
+        obj.flags.writeable = False
+    return obj
+
+def thawed(obj):
+    """Returns a modifiable copy of a frozen read() result (sharing its immutable contents)"""
+    if isinstance(obj, dict):
+        return getattr(obj, '_base', type(obj))((k, thawed(v)) for k, v in obj.items())
+    elif isinstance(obj, list):
+        return [thawed(v) for v in obj]
+    elif hasattr(obj, 'flags'):
+        return obj.copy() # a writeable copy of a numpy array
+    return obj
+
+class Sidecar(object):
+    """On-disk storage for the parsed contents of a file (see the `sidecar` arg to read())
+
+    Entries are directories named for a hash of the file's path, modification time, and size
+    along with the options it was read with. Columnar results are saved as one .npy file per
+    column and memory-mapped when loaded. Lists of namedtuple rows (from cols=True) are saved
+    as plain tuples along with their field names and the Row type is recreated when loaded. All
+    other results are pickled.
+
+    If the file doesn't exist, the sidecar is left empty so read() can report the error.
+    """
+    def __init__(self, pth, opts, cachedir=True):
+        pth = abspath(os.path.expanduser(pth))
+        try:
+            info = os.stat(pth)
+        except OSError:
+            self.path = None
+            return
+        key = repr((pth, info.st_mtime, info.st_size, sorted(opts.items(), key=repr)))
+        root = cachedir if isinstance(cachedir, basestring) else join(cache_dir, 'read')
+        self.path = join(os.path.expanduser(root), sha1(key).hexdigest())
+
+    @property
+    def exists(self):
+        return self.path is not None and exists(self.path)
+
+    def load(self):
+        if exists(join(self.path, 'columns.json')):
+            import numpy
+            with open(join(self.path, 'columns.json'), 'rb') as f:
+                names = json.loads(f.read().decode('utf-8'))
+            arrays = [numpy.load(join(self.path, '%i.npy' % i), mmap_mode='r') for i in range(len(names))]
+            return OrderedDict(zip(names, arrays))
+        if exists(join(self.path, 'rows.pickle')):
+            with open(join(self.path, 'rows.pickle'), 'rb') as f:
+                fields, rows = pickle.load(f)
+            RowType = namedtuple('Row', fields)
+            return [RowType._make(row) for row in rows]
+        with open(join(self.path, 'data.pickle'), 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, result):
+        if self.path is None:
+            return
+        parent, tmp = dirname(self.path), None
+        try:
+            if not exists(parent):
+                os.makedirs(parent)
+            tmp = tempfile.mkdtemp(dir=parent)
+            if isinstance(result, OrderedDict) and result and all(hasattr(v, 'dtype') for v in result.values()):
+                import numpy
+                for i, arr in enumerate(result.values()):
+                    numpy.save(join(tmp, '%i.npy' % i), arr)
+                with open(join(tmp, 'columns.json'), 'wb') as f:
+                    f.write(json.dumps(list(result.keys())).encode('utf-8'))
+            elif isinstance(result, list) and result and hasattr(result[0], '_fields'):
+                # the Row class is created on the fly (so can't be pickled) but its values can
+                with open(join(tmp, 'rows.pickle'), 'wb') as f:
+                    pickle.dump((result[0]._fields, [tuple(row) for row in result]), f, pickle.HIGHEST_PROTOCOL)
+            else:
+                with open(join(tmp, 'data.pickle'), 'wb') as f:
+                    pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp, self.path)
+        except (EnvironmentError, pickle.PicklingError, TypeError, AttributeError):
+            pass # the cache isn't writeable, the result can't be pickled, or another process got there first
+        finally:
+            if tmp and exists(tmp):
+                shutil.rmtree(tmp, ignore_errors=True)
@@ -108,6 +108,20 @@ class CompositingTests(PlotDeviceTestCase):
         image("tests/_in/header.jpg", -130, 0)
         endclip()
 
+    def test_clip_cache(self):
+        from plotdevice.gfx.effects import Stencil
+        p = oval(20, 20, 80, 80, plot=False)
+        cg_path = Stencil(p)._clip_path
+        self.assertTrue(Stencil(p.copy())._clip_path is cg_path)
+        self.assertTrue(Stencil(p, invert=True)._clip_path is not cg_path)
+
+        # modifying the path or the transform invalidates the cached geometry
+        q = p.copy()
+        q.transform.rotate(45)
+        self.assertTrue(Stencil(q)._clip_path is not cg_path)
+        p.lineto(0, 0)
+        self.assertTrue(Stencil(p)._clip_path is not cg_path)
+
 
 def suite():
   suite = unittest.TestSuite()
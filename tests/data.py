@@ -0,0 +1,178 @@
+# encoding: utf-8
+import os
+import bz2
+import gzip
+import shutil
+import tempfile
+import threading
+import unittest
+from io import open
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from . import PlotDeviceTestCase
+from plotdevice import *
+
+class DataServer(BaseHTTPRequestHandler):
+    """Responds to /<n>.json with a small json document (and 404s for anything else)"""
+    def do_GET(self):
+        name, ext = os.path.splitext(self.path.lstrip('/'))
+        if ext != '.json' or not name.isdigit():
+            self.send_error(404)
+            return
+        body = '{"n": %s}' % name
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class DataTests(PlotDeviceTestCase):
+    def setUp(self):
+        super(DataTests, self).setUp()
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _csv(self, body, name='data.csv'):
+        pth = os.path.join(self.tmp, name)
+        with open(pth, 'w', encoding='utf-8') as f:
+            f.write(body)
+        return pth
+
+    def test_read_stream(self):
+        pth = self._csv(u'name,size\nhéllo,1\n"a,b",2\n')
+        rows = read(pth, stream=True)
+        self.assertFalse(isinstance(rows, list))
+        self.assertEqual(list(rows), read(pth))
+        self.assertEqual(read(pth)[1], [u'héllo', u'1'])
+        self.assertEqual([r.size for r in read(pth, cols=True, stream=True)], [u'1', u'2'])
+
+    def test_read_columns(self):
+        try:
+            import numpy
+        except ImportError:
+            return
+        pth = self._csv(u'x,y,label\n' + u''.join(u'%i,%i.5,pt%i\n' % (i, i, i) for i in range(10)))
+        cols = read(pth, columns=True)
+        self.assertEqual(list(cols.keys()), ['x', 'y', 'label'])
+        self.assertEqual(cols['x'].dtype.kind, 'i')
+        self.assertEqual(cols['y'].sum(), sum(i+.5 for i in range(10)))
+        self.assertEqual(cols['label'][3], u'pt3')
+
+        typed = read(pth, columns=True, dtypes={'x':'float32'})
+        self.assertEqual(typed['x'].dtype, numpy.float32)
+
+        from plotdevice.util.readers import csv_columns, csv_dialect
+        with open(pth, encoding='utf-8') as fd:
+            chunks = list(csv_columns(fd, csv_dialect(fd), chunksize=4))
+        self.assertEqual([len(c['x']) for c in chunks], [4, 4, 2])
+
+    def test_read_sidecar(self):
+        pth = self._csv(u'a,b\n1,2\n3,4\n')
+        cache = os.path.join(self.tmp, 'cache')
+        rows = read(pth, sidecar=cache)
+        self.assertEqual(len(os.listdir(cache)), 1)
+        self.assertEqual(read(pth, sidecar=cache), rows)
+        read(pth, sidecar=cache, cols=True, dict=True) # different options get their own entry
+        self.assertEqual(len(os.listdir(cache)), 2)
+
+        # namedtuple rows are saved too (and missing files raise the usual error)
+        rows = read(pth, sidecar=cache, cols=True)
+        self.assertEqual(len(os.listdir(cache)), 3)
+        self.assertEqual(read(pth, sidecar=cache, cols=True, cache=False), rows)
+        self.assertEqual(read(pth, sidecar=cache, cols=True, cache=False)[1].b, u'4')
+        with self.assertRaises(IOError):
+            read(os.path.join(self.tmp, 'missing.csv'), sidecar=cache)
+
+        # an unwriteable cache doesn't keep the file from being read
+        unwriteable = os.path.join(pth, 'cache') # can't create a directory inside a file
+        self.assertEqual(read(pth, sidecar=unwriteable, cache=False), read(pth, cache=False))
+
+        try:
+            import numpy
+        except ImportError:
+            return
+        read(pth, columns=True, sidecar=cache)
+        cols = read(pth, columns=True, sidecar=cache, cache=False)
+        self.assertTrue(isinstance(cols['a'], numpy.memmap))
+        self.assertEqual(list(cols['b']), [2, 4])
+
+    def test_read_memo(self):
+        pth = self._csv(u'a,b\n1,2\n')
+        memo = _ctx._readcache
+        rows = read(pth)
+        self.assertTrue(read(pth) is rows)
+        self.assertEqual((memo.hits, memo.misses), (1, 1))
+
+        # the shared result is read-only but private copies can be modified
+        with self.assertRaises(TypeError):
+            rows[0].append(u'mutated')
+        mine = read(pth, copy=True)
+        mine[0].append(u'mutated')
+        self.assertEqual(read(pth), [[u'a', u'b'], [u'1', u'2']])
+        self.assertEqual(type(mine), list)
+
+        # bypassing the cache or starting a new run re-reads the file
+        read(pth, cache=False)
+        self.assertEqual(memo.hits, 3)
+        _ctx._resetEnvironment()
+        read(pth)
+        self.assertEqual((memo.hits, memo.misses), (0, 1))
+
+        # copies of arrays can be modified without affecting the cached one
+        try:
+            import numpy
+        except ImportError:
+            return
+        with self.assertRaises(ValueError):
+            read(pth, columns=True)['a'][0] = 99
+        cols = read(pth, columns=True, copy=True)
+        cols['a'][0] = 99
+        self.assertEqual(read(pth, columns=True)['a'][0], 1)
+
+    def test_read_many(self):
+        server = HTTPServer(('127.0.0.1', 0), DataServer)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            root = 'http://127.0.0.1:%i/' % server.server_port
+            urls = [root + '%i.json' % i for i in range(20)]
+            urls.insert(5, root + 'missing.json')
+            results = read_many(urls, workers=4)
+            self.assertEqual(len(results), len(urls))
+            self.assertTrue(isinstance(results[5], Exception))
+            del results[5]
+            self.assertEqual([r['n'] for r in results], list(range(20)))
+        finally:
+            server.shutdown()
+
+    def test_read_compressed(self):
+        rows = [[u'n', u'sq']] + [[u'%i' % i, u'%i' % (i*i)] for i in range(1000)]
+        body = u''.join(u','.join(r) + u'\n' for r in rows).encode('utf-8')
+
+        gz = os.path.join(self.tmp, 'data.csv.gz')
+        with gzip.open(gz, 'wb') as f:
+            f.write(body)
+        self.assertEqual(read(gz), rows)
+        self.assertEqual(read(gz, cols=True)[-1].sq, u'998001')
+        self.assertEqual(read(gz, format='gz'), open(gz, 'rb').read())
+
+        # files without a telltale extension are identified by their magic number
+        bz = os.path.join(self.tmp, 'data')
+        with open(bz, 'wb') as f:
+            f.write(bz2.compress(b'{"compressed": true}'))
+        self.assertEqual(read(bz, format='json'), {'compressed': True})
+
+        # text that merely starts with the bz2 prefix is left alone
+        pth = self._csv(u'BZh,size\n1,2\n', name='looks-compressed')
+        self.assertEqual(read(pth, format='csv'), [[u'BZh', u'size'], [u'1', u'2']])
+
+
+def suite():
+  suite = unittest.TestSuite()
+  suite.addTest(unittest.makeSuite(DataTests))
+  return suite
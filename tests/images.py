@@ -0,0 +1,211 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from . import PlotDeviceTestCase, reference
+from plotdevice import *
+from plotdevice.gfx.image import ImageCache
+
+sdist_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class ImageServer(BaseHTTPRequestHandler):
+    """Serves the files in tests/_in with an ETag (and keeps track of its responses)"""
+    log = []
+    delay = 0
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = open(os.path.join(sdist_path, 'tests/_in', self.path.lstrip('/')), 'rb').read()
+        etag = '"%x"' % hash(body)
+        status = 304 if self.headers.get('If-None-Match') == etag else 200
+        ImageServer.log.append(status)
+        self.send_response(status)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', len(body) if status == 200 else 0)
+        self.end_headers()
+        if status == 200:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def serve():
+    """Start a local http server in a background thread and return its root url"""
+    server = HTTPServer(('127.0.0.1', 0), ImageServer)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, 'http://127.0.0.1:%i/' % server.server_port
+
+class ImageTests(PlotDeviceTestCase):
+    def test_cache_lru(self):
+        cache = _ctx._imagecache
+        cache.clear()
+        image('tests/_in/plaid.png', plot=False)
+        image('tests/_in/plaid.png', plot=False)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # shrink the budget so only the newest image fits
+        budget = cache.budget
+        try:
+            cache.budget = cache.nbytes
+            image('tests/_in/triforce.png', plot=False)
+            self.assertEqual(len(cache), 1)
+            self.assertEqual(cache.evictions, 1)
+            image('tests/_in/plaid.png', plot=False)
+            self.assertEqual(cache.misses, 3)
+        finally:
+            cache.budget = budget
+
+    def test_cache_persist(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            cache = ImageCache(cachedir=tmp)
+            img = Image('tests/_in/header.jpg')
+            pth = os.path.join(sdist_path, 'tests/_in/header.jpg')
+            mtime, nbytes = os.path.getmtime(pth), os.path.getsize(pth)
+            cache.persist(img._nsImage, pth, mtime, nbytes)
+            restored = cache.restore(pth, mtime, nbytes)
+            self.assertEqual(tuple(restored.size()), tuple(img._nsImage.size()))
+            self.assertEqual(cache.restore(pth, mtime+1, nbytes), None)
+
+            # the settings can also come from the environment
+            os.environ.update(PLOTDEVICE_IMAGE_CACHE=tmp, PLOTDEVICE_IMAGE_BUDGET='64')
+            cache = ImageCache()
+            self.assertEqual((cache.cachedir, cache.budget), (tmp, 64 * 1024 * 1024))
+            self.assertTrue(cache.restore(pth, mtime, nbytes) is not None)
+            self.assertEqual(ImageCache(budget=1024).budget, 1024)
+        finally:
+            for var in 'PLOTDEVICE_IMAGE_CACHE', 'PLOTDEVICE_IMAGE_BUDGET':
+                os.environ.pop(var, None)
+            shutil.rmtree(tmp)
+
+    def test_prefetch(self):
+        cache = _ctx._imagecache
+        cache.clear()
+        paths = prefetch(['tests/_in/plaid.png', 'tests/_in/triforce.png', 'tests/_in/header.jpg'])
+        for pth in paths:
+            cache.wait(os.path.abspath(pth))
+        self.assertEqual(len(cache), 3)
+
+        # each image is decoded in the background before the loop reaches it
+        hits = cache.hits
+        pngs = files('tests/_in/*.png', prefetch=2)
+        for pth in pngs:
+            image(pth, plot=False)
+        self.assertEqual(cache.hits - hits, len(pngs))
+
+    def test_mipmap(self):
+        cache = ImageCache()
+        src = cache.load('tests/_in/header.jpg')
+        w = src.representations()[0].pixelsWide()
+        density = w / src.size().width
+        self.assertTrue(cache.level(src, density) is src)
+        self.assertTrue(cache.level(src, density*.75) is src)
+
+        # drawing at a fifth of full size should use the quarter-resolution level
+        mip = cache.level(src, density*.2)
+        self.assertEqual(mip.representations()[0].pixelsWide(), w >> 2)
+        self.assertEqual(tuple(mip.size()), tuple(src.size()))
+        self.assertEqual(len(cache), 3) # the source and two levels
+        self.assertTrue(cache.level(src, density*.2) is mip)
+
+        # levels are keyed by the source's path and are dropped along with it
+        key = cache.source(src)
+        self.assertTrue(('mip', key, 2) in cache)
+        cache.put(key, src, mtime=0)
+        self.assertEqual(len(cache), 1)
+
+        # images the cache didn't load are drawn at full size
+        other = Image('tests/_in/header.jpg')._nsImage
+        self.assertTrue(cache.level(other, density*.2) is other)
+
+    def test_pixels(self):
+        try:
+            import numpy
+        except ImportError:
+            return
+        img = Image('tests/_in/plaid.png')
+        px = img.pixels
+        w, h = img._nsBitmap.pixelsWide(), img._nsBitmap.pixelsHigh()
+        self.assertEqual(px.shape[:2], (h, w))
+        self.assertFalse(px.flags.writeable)
+
+        # arrays are wrapped without copying
+        arr = numpy.zeros((20, 30, 4), numpy.uint8)
+        img = Image.from_array(arr, 10, 10)
+        self.assertEqual((img.x, img.y), (10, 10))
+        self.assertEqual(tuple(img._nsImage.size()), (30, 20))
+        arr[2, 3] = (255, 128, 0, 255)
+        self.assertEqual(tuple(img.pixels[2, 3]), (255, 128, 0, 255))
+        self.assertEqual(Image.from_array(numpy.ones((5, 5))).pixels.max(), 255)
+
+        # vector images are rasterized for the view but still drawn as vectors
+        size(40, 30)
+        rect(0, 0, 40, 30, fill='red')
+        vec = Image(data=_ctx.canvas._getImageData('pdf'))
+        nsImage, reps = vec._nsImage, list(vec._nsImage.representations())
+        self.assertEqual(vec.pixels.shape[:2], (30, 40))
+        self.assertTrue(vec._nsImage is nsImage)
+        self.assertEqual(list(nsImage.representations()), reps)
+
+    def test_stencil_cache(self):
+        from plotdevice.gfx.effects import Stencil
+        cache = _ctx._imagecache
+        cache.clear()
+        img = Image('tests/_in/logo-stencil.png')
+        mask = Stencil(img)._mask
+        self.assertTrue(Stencil(img)._mask is mask)
+        self.assertTrue(Stencil(img, invert=True)._mask is not mask)
+        self.assertEqual(len(cache), 3) # the source image and two masks
+
+        # masks go away with their source image
+        cache.put(cache.source(img._nsImage), img._nsImage, mtime=0)
+        self.assertEqual(len(cache), 1)
+
+        # and aren't cached for pixel buffers that may be modified in place
+        try:
+            import numpy
+        except ImportError:
+            return
+        arr = numpy.zeros((20, 30, 4), numpy.uint8)
+        live = Image.from_array(arr)
+        self.assertTrue(Stencil(live)._mask is not Stencil(live)._mask)
+        self.assertEqual(len(cache), 1)
+
+    def test_remote_revalidation(self):
+        from plotdevice.util.readers import FETCHER
+        server, root = serve()
+        try:
+            del ImageServer.log[:]
+            url = root + 'plaid.png'
+            first = image(url, plot=False)
+            image(url, plot=False)
+            self.assertEqual(ImageServer.log, [200]) # the second call is short-circuited
+
+            # a new run revalidates the url but reuses the cached image
+            _ctx._resetEnvironment()
+            again = image(url, plot=False)
+            self.assertEqual(ImageServer.log, [200, 304])
+            self.assertTrue(again._nsImage is first._nsImage)
+
+            # concurrent requests for the same url share a single fetch
+            del ImageServer.log[:]
+            ImageServer.delay = 0.25
+            threads = [threading.Thread(target=FETCHER.get, args=(root+'triforce.png',)) for i in range(4)]
+            for t in threads: t.start()
+            for t in threads: t.join()
+            self.assertEqual(ImageServer.log, [200])
+        finally:
+            ImageServer.delay = 0
+            server.shutdown()
+
+
+def suite():
+  suite = unittest.TestSuite()
+  suite.addTest(unittest.makeSuite(ImageTests))
+  return suite
@@ -1,11 +1,48 @@
 import os
+import sys
+import json
+import shutil
+import tempfile
 import unittest
+from time import time
 from . import PlotDeviceTestCase, reference
 from subprocess import check_output, STDOUT
 from plotdevice import *
 
 sdist_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+def report(label, secs):
+    """Print a timing alongside the test results (rather than asserting a limit on slow machines)"""
+    sys.stderr.write('\n  %s: %.3fms ' % (label, secs*1000))
+
+# imports plotdevice in a fresh interpreter and reports the (cumulative) time spent loading
+# each module along with whether the expensive bits of setup were deferred
+STARTUP_PROBE = """
+import sys, json, time, __builtin__
+sys.path.extend(%r)
+timings, _import = {}, __builtin__.__import__
+def timed_import(name, *args, **kwargs):
+    if name in sys.modules:
+        return _import(name, *args, **kwargs)
+    t = time.time()
+    try:
+        return _import(name, *args, **kwargs)
+    finally:
+        timings.setdefault(name, time.time() - t)
+__builtin__.__import__ = timed_import
+
+t = time.time()
+import plotdevice
+total = time.time() - t
+__builtin__.__import__ = _import
+
+from plotdevice.lib import foundry
+from plotdevice.gfx import colors
+deferred = dict(fonts=foundry.LIBRARY._fonts is None, colors=colors._CSS_COLORS is None,
+                requests='requests' not in sys.modules)
+print json.dumps(dict(total=total, timings=timings, deferred=deferred))
+"""
+
 class ModuleTests(PlotDeviceTestCase):
     def test_pyobjc(self):
         import objc
@@ -33,6 +70,232 @@ class ModuleTests(PlotDeviceTestCase):
         check_output([plod_bin, script, '--export', output], stderr=STDOUT, cwd=sdist_path)
         self.render(save_output=False)
 
+    def test_bytecode_cache(self):
+        from plotdevice.run.sandbox import CodeCache
+        tmp = tempfile.mkdtemp()
+        try:
+            src = u'answer = 6 * 7\n'
+            cache = CodeCache(cachedir=tmp)
+            code = cache.compile(src, 'script.pv')
+            self.assertTrue(cache.compile(src, 'script.pv') is code)
+            self.assertEqual(len(os.listdir(tmp)), 1)
+
+            # a fresh cache (e.g., in a later console run) loads the marshaled code
+            ns = {}
+            exec CodeCache(cachedir=tmp).compile(src, 'script.pv') in ns
+            self.assertEqual(ns['answer'], 42)
+            cache.compile(src, 'renamed.pv')
+            self.assertEqual(len(os.listdir(tmp)), 2)
+            self.assertRaises(SyntaxError, cache.compile, u'answer = (', 'script.pv')
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_animation_env(self):
+        from plotdevice.run.sandbox import Sandbox
+        vm = Sandbox()
+        vm.path = os.path.join(sdist_path, 'tests/_in/anim.pv')
+        vm.source = u'import os\ndef draw():\n    print os.getcwd()\n'
+        cwd, syspath = os.getcwd(), list(sys.path)
+        self.assertTrue(vm.run().ok)
+
+        # the script's environment stays in place between frames but output is per-call
+        frames = [vm.run('draw') for i in range(3)]
+        self.assertEqual([f.output[0].data.strip() for f in frames], [os.path.dirname(vm.path)]*3)
+        self.assertTrue(Sandbox._boxed[0] is vm)
+        self.assertEqual(len(frames[-1].output), 1) # the text & newline are merged into one entry
+
+        vm.stop()
+        self.assertEqual((os.getcwd(), sys.path), (cwd, syspath))
+        self.assertEqual(Sandbox._boxed, None)
+
+    def test_output_capture(self):
+        from plotdevice.run.sandbox import StdIO
+        output = StdIO()
+        out, err = output.pipes
+        for i in range(1000):
+            out.write('%i\n' % i)
+        err.write('oops\n')
+        self.assertEqual([o.isErr for o in output.data], [False, True])
+        self.assertEqual(output.data[0].data.count('\n'), 1000)
+
+        # only the most recent output is retained once the limit is reached
+        output.limit = 100
+        out.write('x' * 50)
+        self.assertEqual(output.data[0], (True, u'[3890 characters of earlier output omitted]\n'))
+        self.assertEqual([o.data for o in output.data[1:]], [u'oops\n', u'x'*50])
+
+    def test_dashboard_debounce(self):
+        from plotdevice.run.sandbox import Sandbox
+        vm = Sandbox()
+        vm.source = u'var("side", NUMBER, 10, 0, 100)\nrect(0, 0, side, side)\n'
+        self.assertTrue(vm.run().ok)
+
+        # collect the timer callbacks rather than waiting on the runloop
+        timers, runs = [], []
+        vm._later = lambda delay, fn, *args: timers.append((fn, args))
+        rerun = lambda: runs.append(vm.run())
+        for side in (20, 30, 40):
+            vm.tweak('side', side, rerun)
+        for fn, args in timers:
+            fn(*args)
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(vm.namespace['side'], 40)
+
+        # a run that happens before the timer fires picks up the change instead
+        del timers[:]
+        vm.tweak('side', 50, rerun)
+        vm.run()
+        self.assertEqual(vm.namespace['side'], 50)
+        for fn, args in timers:
+            fn(*args)
+        self.assertEqual(len(runs), 1)
+
+        vm.tweak('side', 60, rerun)
+        vm.discard_pending()
+        vm.run()
+        self.assertEqual(vm.namespace['side'], 50)
+
+    def test_run_overhead(self):
+        from plotdevice.run.sandbox import Sandbox
+        vm = Sandbox()
+        vm.source = u'pass'
+        self.assertTrue(vm.run().ok)
+        self.assertEqual(vm.namespace['_ctx'], vm.context)
+        self.assertEqual(vm.namespace['rect'], vm.context.rect)
+
+        # scripts can't clobber the defaults seen by subsequent runs
+        vm.namespace['rect'] = None
+        vm.run()
+        self.assertEqual(vm.namespace['rect'], vm.context.rect)
+
+        # time the per-run bookkeeping for a script that does nothing
+        runs = 200
+        t = time()
+        for i in range(runs):
+            self.assertTrue(vm.run().ok)
+        report('empty script per run', (time() - t) / runs)
+        self.assertEqual(vm.namespace['_ctx'], vm.context)
+
+    def test_state_stack(self):
+        translate(10, 10)
+        alpha(.5)
+        push()
+        _ctx._saveContext()
+        saved = _ctx._statestack[-1]
+
+        # changes after a save shouldn't leak into the snapshot (or vice versa)
+        translate(5, 5)
+        alpha(.25)
+        with rotate(45), blend('multiply'):
+            pass
+        pop()
+        self.assertEqual(tuple(_ctx._transform)[-2:], (10, 10))
+        self.assertEqual(_ctx._effects.alpha, .25)
+        _ctx._restoreContext()
+        self.assertTrue(all(a is b for a, b in zip(saved, [getattr(_ctx, v) for v in _ctx._state_vars])))
+        self.assertEqual(tuple(_ctx._transform)[-2:], (10, 10))
+        self.assertEqual(_ctx._effects.alpha, .5)
+        self.assertEqual(len(_ctx._transformstack), 1)
+
+        # colors modified in place after a save leave the snapshot's colors intact
+        fill(.2)
+        stroke(0)
+        _ctx._saveContext()
+        fill().alpha = .5
+        stroke().alpha = .25
+        _ctx._restoreContext()
+        self.assertEqual((fill().alpha, stroke().alpha), (1.0, 1.0))
+
+        # nested state changes unwind back to where they started
+        reps = 2000
+        t = time()
+        for i in range(reps):
+            _ctx._saveContext()
+            with translate(1, 1), fill(.5), alpha(.5):
+                with rotate(i), stroke(0), scale(2):
+                    push()
+                    skew(5)
+                    pop()
+            _ctx._restoreContext()
+        report('nested state changes per pass', (time() - t) / reps)
+        self.assertEqual(tuple(_ctx._transform)[-2:], (10, 10))
+        self.assertEqual(_ctx._effects.alpha, .5)
+        self.assertEqual(len(_ctx._transformstack), 1)
+
+    def test_shared_styles(self):
+        fill(.2)
+        alpha(.5)
+        translate(5, 5)
+        r1, r2 = rect(0,0,10,10), rect(0,0,10,10)
+        self.assertTrue(r1._fillcolor is r2._fillcolor is _ctx._fillcolor)
+        self.assertTrue(r1._transform is r2._transform is _ctx._transform)
+
+        # modifying one grob (or the context) leaves the others' styles intact
+        r1.fill.alpha = .25
+        r2.translate(10, 0)
+        r2.alpha = .1
+        alpha(.75)
+        self.assertEqual((r1.fill.alpha, r2.fill.alpha, _ctx._fillcolor.alpha), (.25, 1.0, 1.0))
+        self.assertEqual(tuple(r1.transform)[-2:], (5, 5))
+        self.assertEqual(tuple(_ctx._transform)[-2:], (5, 5))
+        self.assertEqual((r1.alpha, r2.alpha, _ctx._effects.alpha), (.5, .1, .75))
+
+        clone = r2.copy()
+        clone.rotate(45)
+        clone.shadow = 'black', 2
+        self.assertEqual(tuple(r2.transform)[-2:], (15, 5))
+        self.assertEqual(r2.shadow, None)
+
+        # colors returned by the context's getters can be modified without touching prior grobs
+        fill().alpha = .5
+        stroke(0).alpha = .5
+        self.assertEqual((r1.fill.alpha, r2.fill.alpha, _ctx._fillcolor.alpha), (.25, 1.0, .5))
+        r3 = rect(0,0,10,10)
+        stroke().alpha = .75
+        self.assertEqual((r3.stroke.alpha, _ctx._strokecolor.alpha), (.5, .75))
+
+        # a with-block's color is restored as shared with the grobs drawn before it
+        with fill(1):
+            rect(0,0,10,10)
+        fill().alpha = .1
+        self.assertEqual((r3.fill.alpha, _ctx._fillcolor.alpha), (.5, .1))
+
+    def test_sweep(self):
+        from plotdevice import DeviceError
+        from plotdevice.run import sweep
+        from plotdevice.run.sweep import steps
+        self.assertEqual(steps('0:1:3'), [0, .5, 1])
+        self.assertEqual(steps('red, blue'), ['red', 'blue'])
+
+        tmp = tempfile.mkdtemp()
+        try:
+            script = os.path.join(tmp, 'swept.pv')
+            with open(script, 'w') as f:
+                f.write('size(100, 100)\nvar("side", NUMBER, 10, 0, 100)\nvar("hue", TEXT, "red")\n'
+                        'rect(0, 0, side, side, fill=hue)\n')
+            swept = sweep(script, ['side=20:80:3', 'hue=red,blue'], os.path.join(tmp, 'out.png'), workers=2)
+            self.assertEqual([s['index'] for s in swept], list(range(1, 7)))
+            self.assertTrue(all(s['ok'] for s in swept))
+            self.assertEqual(dict(swept[-1]['values']), {'side':80.0, 'hue':'blue'})
+            for name in ['out-%04i.png' % i for i in range(1, 7)] + ['out-sheet.png', 'out-index.json']:
+                self.assertTrue(os.path.exists(os.path.join(tmp, name)), name)
+
+            # names that aren't declared with var() are rejected rather than ignored
+            with self.assertRaises(DeviceError):
+                sweep(script, ['sides=20:80:3'], os.path.join(tmp, 'typo.png'))
+            self.assertFalse(os.path.exists(os.path.join(tmp, 'typo-index.json')))
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_startup(self):
+        probe = STARTUP_PROBE % [sdist_path, os.path.join(sdist_path, 'build/lib')]
+        report = json.loads(check_output([sys.executable, '-c', probe], cwd=sdist_path))
+        slowest = sorted(report['timings'].items(), key=lambda t:-t[1])[:10]
+        breakdown = "\n".join('%8.1fms  %s' % (secs*1000, mod) for mod, secs in slowest)
+
+        # fonts, colors, and the http session shouldn't be set up until they're used
+        self.assertEqual(report['deferred'], dict(fonts=True, colors=True, requests=True), breakdown)
+
 
 def suite():
     from unittest import TestSuite, makeSuite
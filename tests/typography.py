@@ -2,6 +2,7 @@
 import unittest
 from . import PlotDeviceTestCase, reference
 from plotdevice import *
+from plotdevice import DeviceError
 
 class TypographyTests(PlotDeviceTestCase):
     @reference('typography/typography-basics.png')
@@ -491,6 +492,103 @@ class TypographyTests(PlotDeviceTestCase):
             rect(slug.bounds, stroke=.6) # dark
             arc(slug.baseline, 4, fill='red')
 
+    def test_paginate(self):
+        # pages share the original's storage but index their text & nodes from the page-break
+        size(200, 200)
+        font('Helvetica', 12)
+        grafs = ["<p>%s</p>" % (("Graf %i. " % i) * 30) for i in range(20)]
+        pages = list(paginate(10,10, 180,180, xml="\n".join(grafs)))
+        self.assertTrue(len(pages) > 1)
+        self.assertEqual([pg.idx for pg in pages], range(len(pages)))
+
+        # asking the same page for its successor twice doesn't add another page
+        nxt = pages[0].overleaf()
+        self.assertTrue(nxt is pages[0].overleaf())
+        self.assertEqual(nxt.text, pages[1].text)
+
+        body = pages[0]._store.string()
+        self.assertEqual(u"".join(b.text for pg in pages for b in pg.blocks), body)
+        for pg in pages:
+            self.assertEqual(pg.text, body[pg._origin:])
+            self.assertEqual(plot(pg).text, pg.text)
+            for graf in pg.select('p'):
+                self.assertTrue(graf.end > 0)
+                self.assertTrue(graf.blocks)
+                if graf.start >= 0:
+                    self.assertTrue(graf.text.startswith('Graf'))
+
+        # copies of a page are standalone, so changing one leaves the pages & original alone
+        texts = [pg.text for pg in pages]
+        firsts = [pg.blocks[0].text for pg in pages]
+        dupe = pages[1].copy()
+        self.assertFalse(dupe._shared)
+        self.assertEqual(dupe.text, texts[1])
+        self.assertEqual(len(dupe.select('p', all)), len(pages[1].select('p', all)))
+        dupe.width, dupe.height = 90, 90
+        dupe.append(u' coda')
+        list(dupe.flow(3))
+        self.assertTrue(dupe.text.endswith(u' coda'))
+        self.assertEqual([pg.text for pg in pages], texts)
+        self.assertEqual([pg.blocks[0].text for pg in pages], firsts)
+
+        # pages themselves can't be appended to
+        with self.assertRaises(DeviceError):
+            pages[1].append(u' coda')
+        self.assertEqual(pages[1].text, texts[1])
+
+        # pages that are no longer referenced are removed from the shared layout
+        import gc
+        src = Text(pages[0])
+        src.width, src.height = 180, 180
+        containers = len(src._engine.textContainers())
+        src.overleaf().overleaf()
+        gc.collect()
+        self.assertEqual(len(src._engine.textContainers()), containers)
+
+    def test_xml_stream(self):
+        # chunked parsing should yield the same body, styles & nodes as a single pass
+        from plotdevice.util.readers import XMLParser
+        doc = u"<p>Tëxt with <b>bold</b> &amp; <i>italic <b>runs</b></i><br/>\nand a break</p>\n" * 50
+        whole = XMLParser(doc)
+        streamed = XMLParser()
+        streamed.chunksize = 17
+        body, regions = u"", {}
+        for txt, runs in streamed.stream(doc):
+            for cascade, start, length in runs:
+                regions.setdefault(cascade, []).append((len(body)+start, length))
+            body += txt
+        self.assertEqual(body, whole.text)
+        self.assertEqual(streamed.nodes, whole.nodes)
+        for cascade, runs in whole.regions.items():
+            self.assertEqual(sum(n for _, n in runs), sum(n for _, n in regions[cascade]))
+
+        t = Text(xml=doc)
+        self.assertEqual(t.text, whole.text)
+        self.assertEqual(len(t.select('b', all)), 100)
+
+    def test_find_indexed(self):
+        # matches should be located in the blocks whose text contains them
+        size(300, 300)
+        font('Helvetica', 10)
+        t = text(10,10, 80,80, str="the quick brown fox jumps over the lazy dog. " * 40, plot=False)
+        t.flow(3)
+        found = t.find('the', all)
+        self.assertEqual(len(found), 80)
+        visible = t.find('the')
+        self.assertTrue(0 < len(visible) < len(found))
+        for match in visible:
+            self.assertEqual(match.text, 'the')
+            self.assertTrue(any(match.text in block.text for block in match.blocks))
+
+        # matches reflect the current layout after a reflow
+        last = visible[-1]
+        self.assertTrue(last.blocks and t.blocks[0] not in last.blocks)
+        t.flow(1)
+        self.assertEqual(last.blocks, [])
+
+        t.append(" the end")
+        self.assertEqual(len(t.find('the', all)), 81)
+
 
 def suite():
   suite = unittest.TestSuite()